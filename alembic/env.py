@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 from sqlmodel import SQLModel
 from app.config import db_settings
-from app.api.routes.v1.analysis.models import JobInvite, JobResponse
+from app.api.routes.v1.analysis.models import JobInvite, JobResponse, CallRollup, AnalysisWatermark
 
 config = context.config
 config.set_main_option("sqlalchemy.url", db_settings.MYSQL_URL)
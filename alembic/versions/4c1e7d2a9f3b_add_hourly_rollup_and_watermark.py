@@ -0,0 +1,53 @@
+"""Add hourly rollup and watermark tables, and index jobinvite.call_start_time
+
+Revision ID: 4c1e7d2a9f3b
+Revises: bad809bcbf4d
+Create Date: 2025-08-22 11:05:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1e7d2a9f3b'
+down_revision: Union[str, Sequence[str], None] = 'bad809bcbf4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'jobinvite_hourly_rollup',
+        sa.Column('countryCode', mysql.VARCHAR(length=16), nullable=False, comment="Normalized country code, 'None' when missing"),
+        sa.Column('call_date', sa.Date(), nullable=False, comment='Date of call_start_time'),
+        sa.Column('call_hour', mysql.TINYINT(), autoincrement=False, nullable=False, comment='Hour of call_start_time'),
+        sa.Column('outcome', mysql.TINYINT(), autoincrement=False, nullable=False, comment='0-not answered, 1-not interested, 2-interested'),
+        sa.Column('calls', sa.Integer(), server_default=sa.text("'0'"), nullable=False, comment='Number of calls'),
+        sa.Column('duration_sum', sa.BigInteger(), server_default=sa.text("'0'"), nullable=False, comment='Sum of positive total_call'),
+        sa.Column('duration_n', sa.Integer(), server_default=sa.text("'0'"), nullable=False, comment='Calls with positive total_call'),
+        sa.Column('dtmf_sum', sa.Integer(), server_default=sa.text("'0'"), nullable=False, comment='Sum of answered DTMF questions'),
+        sa.Column('dtmf_n', sa.Integer(), server_default=sa.text("'0'"), nullable=False, comment='Calls with a DTMF value'),
+        sa.PrimaryKeyConstraint('countryCode', 'call_date', 'call_hour', 'outcome'),
+    )
+    op.create_table(
+        'analysis_watermark',
+        sa.Column('name', mysql.VARCHAR(length=50), nullable=False, comment='Watermark owner'),
+        sa.Column('last_call_start_time', sa.DateTime(), nullable=True, comment='Highest call_start_time folded in'),
+        sa.Column('last_nid', sa.Integer(), nullable=True, comment='Highest jobinvite nid folded in'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, comment='Last refresh time'),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    # The rollup's rescan (call_start_time >= rescan_from) reads a few days, not the table
+    op.create_index('CALLSTARTTIME_INDX', 'jobinvite', ['call_start_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('CALLSTARTTIME_INDX', table_name='jobinvite')
+    op.drop_table('analysis_watermark')
+    op.drop_table('jobinvite_hourly_rollup')
@@ -0,0 +1,29 @@
+"""Add jobinvite (countryCode, call_start_time) index
+
+Revision ID: 7d3a5c8e2b16
+Revises: 9e2b6d4f1a7c
+Create Date: 2025-08-28 09:41:27.205318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3a5c8e2b16'
+down_revision: Union[str, Sequence[str], None] = '9e2b6d4f1a7c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Each parallel shard reads one country's window (countryCode = ? AND call_start_time >= ?)
+    op.create_index('COUNTRY_CALLSTARTTIME_INDX', 'jobinvite', ['countryCode', 'call_start_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('COUNTRY_CALLSTARTTIME_INDX', table_name='jobinvite')
@@ -0,0 +1,36 @@
+"""Add analysis lease table
+
+Revision ID: 9e2b6d4f1a7c
+Revises: 4c1e7d2a9f3b
+Create Date: 2025-08-26 10:12:03.481730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2b6d4f1a7c'
+down_revision: Union[str, Sequence[str], None] = '4c1e7d2a9f3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'analysis_lease',
+        sa.Column('name', mysql.VARCHAR(length=50), nullable=False, comment='Job the lease elects a leader for'),
+        sa.Column('holder', mysql.VARCHAR(length=100), nullable=False, comment='host:pid:token of the current leader'),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False, comment='When the holder took the lease (UTC)'),
+        sa.Column('expires_at', sa.DateTime(), nullable=False, comment='Lease is free after this time unless renewed (UTC)'),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('analysis_lease')
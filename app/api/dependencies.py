@@ -1,19 +1,23 @@
 # app/api/routes/v1/portfolio/dependencies.py
 
-from typing import Annotated
+from typing import Annotated, AsyncGenerator
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_session
+from app.db.session import get_session, async_session_maker
 from app.api.routes.v1.analysis.services import AnalysisService
 
 # DB Dependencies
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
 
 # Service Dependency
-def get_analysis_service(
-    session: SessionDep,
-) -> AnalysisService:
-    return AnalysisService(session=session)
+async def get_analysis_service() -> AsyncGenerator[AnalysisService, None]:
+    # The session is only created (and a connection only checked out) when a
+    # DB-backed method runs; the results endpoints are served from files
+    service = AnalysisService(session_maker=async_session_maker)
+    try:
+        yield service
+    finally:
+        await service.close()
 
-AnalysisServiceDep = Annotated[AnalysisService, Depends(get_analysis_service)]
\ No newline at end of file
+AnalysisServiceDep = Annotated[AnalysisService, Depends(get_analysis_service)]
@@ -0,0 +1,17 @@
+# app/api/lifespan.py
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from app.db.session import warm_up_pools, dispose_engines
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    API-only process (API_RUN_SCHEDULER=false): DB pools but no scheduler, so
+    neither APScheduler nor the analysis code is imported. The analysis runs in
+    `python -m app.workers` and the API serves what it publishes.
+    """
+    await warm_up_pools()
+    yield
+    await dispose_engines()
+    print("DB pools disposed ❌")
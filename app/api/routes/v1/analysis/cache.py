@@ -0,0 +1,214 @@
+import asyncio
+import gzip
+import hashlib
+from email.utils import formatdate
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+import orjson
+
+try:
+    import brotli
+except ImportError:  # listed in requirements.txt; without it only gzip variants are built
+    brotli = None
+
+from app.api.routes.v1.analysis.schemas import AnalysisRead
+from app.config import app_settings
+from app.core.metrics import Counter
+from app.core.results_store import (
+    RESULTS_DIR,
+    LEGACY_FILE,
+    MANIFEST_FILE,
+    read_manifest,
+    load_results,
+    load_artifact,
+    current_results_path,
+)
+from app.core.slot_index import SlotIndex, build_slot_index
+
+RESULTS_CACHE_RELOADS = Counter(
+    "analysis_results_cache_reloads_total",
+    "Times the API re-parsed, re-validated and re-rendered the published analysis results",
+)
+
+
+GZIP_LEVEL = app_settings.RESPONSE_GZIP_LEVEL
+BROTLI_QUALITY = app_settings.RESPONSE_BROTLI_QUALITY
+# Projections are rendered on request, so they trade a larger body for a fast first response
+PROJECTION_GZIP_LEVEL = 1
+PROJECTION_BROTLI_QUALITY = 1
+# Distinct projected queries (country list / windows / weekdays / metrics) kept per result version
+PROJECTION_CACHE_SIZE = 256
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}, e.g. "br;q=1.0, gzip;q=0.5, *;q=0" -> {"br": 1.0, "gzip": 0.5, "*": 0.0}."""
+    codings = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        codings[coding.strip().lower()] = q
+    return codings
+
+
+class RenderedBody(NamedTuple):
+    """A response body with its validators and precompressed variants."""
+    content: bytes
+    etag: str
+    last_modified: str
+    # Content-Encoding -> (compressed bytes, ETag of that representation)
+    encodings: Dict[str, Tuple[bytes, str]]
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Tuple[Optional[str], bytes, str]:
+        """
+        Pick (content_encoding, body, etag) for an Accept-Encoding header, preferring
+        the smallest acceptable variant and falling back to identity.
+        """
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        best = None
+        for coding, (body, etag) in self.encodings.items():
+            if accepted.get(coding, wildcard) > 0 and (best is None or len(body) < len(best[1])):
+                best = (coding, body, etag)
+        return best or (None, self.content, self.etag)
+
+
+def _etag(content: bytes, suffix: str = "") -> str:
+    return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}{suffix}"'
+
+
+def _render(
+    payload, last_modified: str, gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY
+) -> RenderedBody:
+    content = orjson.dumps(payload)
+    encodings = {"gzip": gzip.compress(content, compresslevel=gzip_level, mtime=0)}
+    if brotli is not None:
+        encodings["br"] = brotli.compress(content, quality=brotli_quality)
+    # Strong ETags from the uncompressed bytes, so countries unchanged by a run
+    # keep theirs; each encoding is a distinct representation with its own tag
+    return RenderedBody(
+        content,
+        _etag(content),
+        last_modified,
+        {coding: (body, _etag(content, f"-{coding}")) for coding, body in encodings.items()},
+    )
+
+
+class RenderedResults:
+    """
+    One published result version: the validated AnalysisRead plus its response
+    bodies, serialized and compressed once for the all-countries response and
+    for each country. Projected queries are rendered on first use, in a worker
+    thread and at the fast PROJECTION_* levels, and memoized for the lifetime
+    of the version. `slot_index` is the ranked slot index
+    published with the version; it is built from the results when the version
+    has none.
+    """
+
+    __slots__ = (
+        "results", "run_id", "data", "last_modified", "all_body", "country_bodies", "projections", "slot_index",
+    )
+
+    def __init__(
+        self,
+        results: AnalysisRead,
+        run_id: Optional[str] = None,
+        modified_at: Optional[float] = None,
+        slot_index: Optional[dict] = None,
+    ):
+        self.results = results
+        self.run_id = run_id
+        self.last_modified = formatdate(modified_at, usegmt=True)
+        # Same JSON shape response_model=AnalysisRead produces, null fields included
+        self.data: Dict[str, dict] = results.model_dump(mode="json")["data"]
+        self.all_body: RenderedBody = _render({"data": self.data}, self.last_modified)
+        self.country_bodies: Dict[str, RenderedBody] = {
+            country: _render({"data": {country: analysis}}, self.last_modified)
+            for country, analysis in self.data.items()
+        }
+        self.projections: Dict[tuple, RenderedBody] = {}
+        self.slot_index = SlotIndex(slot_index if slot_index is not None else build_slot_index(self.data))
+
+    def _render_projection(self, build: Callable[[], dict]) -> RenderedBody:
+        return _render(build(), self.last_modified, PROJECTION_GZIP_LEVEL, PROJECTION_BROTLI_QUALITY)
+
+    async def projection(self, key: tuple, build: Callable[[], dict]) -> RenderedBody:
+        """
+        Rendered body for a projected query, building the payload with `build` on a
+        miss. `key` must be canonical (see services._selection) so that the same
+        projection requested in another order shares the entry.
+        """
+        rendered = self.projections.get(key)
+        if rendered is None:
+            rendered = await asyncio.to_thread(self._render_projection, build)
+            # Another request may have rendered the same key meanwhile
+            if key not in self.projections:
+                if len(self.projections) >= PROJECTION_CACHE_SIZE:
+                    # Evict the oldest entry
+                    del self.projections[next(iter(self.projections))]
+                self.projections[key] = rendered
+        return rendered
+
+
+class AnalysisResultsCache:
+    """
+    Process-wide parsed, validated and pre-rendered (RenderedResults) copy of
+    the published results.
+
+    Every lookup stats the live artifact (current.json, or the legacy
+    best_times.json before the first versioned run). The file is only re-read
+    when its inode, mtime or size changed, which is the case whenever the cron
+    points current.json at a new run id. Concurrent requests that see a stale
+    entry wait on one reload instead of each parsing the file, and the parse runs
+    in a worker thread so the event loop keeps serving.
+    """
+
+    def __init__(self, results_dir: Path = RESULTS_DIR):
+        self.results_dir = results_dir
+        self._key = None
+        self._rendered: Optional[RenderedResults] = None
+        self._lock = asyncio.Lock()
+
+    def _artifact_key(self) -> tuple:
+        for name in (MANIFEST_FILE, LEGACY_FILE):
+            try:
+                stat = (self.results_dir / name).stat()
+            except FileNotFoundError:
+                continue
+            return name, stat.st_ino, stat.st_mtime_ns, stat.st_size
+        raise FileNotFoundError(f"Analysis results file not found in {self.results_dir}")
+
+    def _load(self) -> RenderedResults:
+        manifest = read_manifest(self.results_dir)
+        modified_at = current_results_path(self.results_dir, manifest).stat().st_mtime
+        results = AnalysisRead(data=load_results(self.results_dir))
+        slot_index = load_artifact("slot_index", self.results_dir, manifest)
+        return RenderedResults(results, manifest["run_id"] if manifest else None, modified_at, slot_index)
+
+    async def get_rendered(self) -> RenderedResults:
+        key = self._artifact_key()
+        if key == self._key:
+            return self._rendered
+
+        async with self._lock:
+            # Another request may have reloaded while we waited
+            key = self._artifact_key()
+            if key != self._key:
+                self._rendered = await asyncio.to_thread(self._load)
+                self._key = key
+                RESULTS_CACHE_RELOADS.inc()
+        return self._rendered
+
+    async def get(self) -> AnalysisRead:
+        return (await self.get_rendered()).results
+
+
+results_cache = AnalysisResultsCache()
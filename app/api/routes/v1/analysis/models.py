@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from sqlmodel import SQLModel, Field, Column
-from sqlalchemy import String, Text, BigInteger, Integer, SmallInteger, Float, DECIMAL, DateTime, text, Index, UniqueConstraint
+from sqlalchemy import String, Text, BigInteger, Integer, SmallInteger, Float, DECIMAL, Date, DateTime, text, Index, UniqueConstraint
 from sqlalchemy.dialects.mysql import TINYINT, MEDIUMINT, VARCHAR
 
 
@@ -92,5 +92,38 @@ class JobInvite(SQLModel, table=True):
     __table_args__ = (
         Index("INDX_NCALLIFYREFINVID", "NCALLIFYREFINVID"),
         Index("UPLOADTYPE_INDX", "upload_type"),
+        Index("CALLSTARTTIME_INDX", "call_start_time"),
+        Index("COUNTRY_CALLSTARTTIME_INDX", "countryCode", "call_start_time"),
         UniqueConstraint("jobnumber", "emailid", name="unique_record"),  # Updated to match database
-    )
\ No newline at end of file
+    )
+
+class CallRollup(SQLModel, table=True):
+    __tablename__ = "jobinvite_hourly_rollup"
+
+    countryCode: str = Field(sa_column=Column(VARCHAR(16), primary_key=True, comment="Normalized country code, 'None' when missing"))
+    call_date: date = Field(sa_column=Column(Date, primary_key=True, comment="Date of call_start_time"))
+    call_hour: int = Field(sa_column=Column(TINYINT, primary_key=True, autoincrement=False, comment="Hour of call_start_time"))
+    outcome: int = Field(sa_column=Column(TINYINT, primary_key=True, autoincrement=False, comment="0-not answered, 1-not interested, 2-interested"))
+    calls: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default=text("'0'"), comment="Number of calls"))
+    duration_sum: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, server_default=text("'0'"), comment="Sum of positive total_call"))
+    duration_n: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default=text("'0'"), comment="Calls with positive total_call"))
+    dtmf_sum: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default=text("'0'"), comment="Sum of answered DTMF questions"))
+    dtmf_n: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default=text("'0'"), comment="Calls with a DTMF value"))
+
+
+class AnalysisWatermark(SQLModel, table=True):
+    __tablename__ = "analysis_watermark"
+
+    name: str = Field(sa_column=Column(VARCHAR(50), primary_key=True, comment="Watermark owner"))
+    last_call_start_time: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, nullable=True, comment="Highest call_start_time folded in"))
+    last_nid: Optional[int] = Field(default=None, sa_column=Column(Integer, nullable=True, comment="Highest jobinvite nid folded in"))
+    updated_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, nullable=True, comment="Last refresh time"))
+
+
+class AnalysisLease(SQLModel, table=True):
+    __tablename__ = "analysis_lease"
+
+    name: str = Field(sa_column=Column(VARCHAR(50), primary_key=True, comment="Job the lease elects a leader for"))
+    holder: str = Field(sa_column=Column(VARCHAR(100), nullable=False, comment="host:pid:token of the current leader"))
+    acquired_at: datetime = Field(sa_column=Column(DateTime, nullable=False, comment="When the holder took the lease (UTC)"))
+    expires_at: datetime = Field(sa_column=Column(DateTime, nullable=False, comment="Lease is free after this time unless renewed (UTC)"))
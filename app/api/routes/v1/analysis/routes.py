@@ -1,4 +1,6 @@
-from typing import Optional
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
 from fastapi import (
     APIRouter,
     HTTPException,
@@ -6,45 +8,109 @@ from fastapi import (
     File,
     Form,
     UploadFile,
+    Query,
+    Request,
     Response
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import EmailStr
 
 from app.api.dependencies import AnalysisServiceDep
 from app.api.routes.v1.analysis.schemas import (
-    AnalysisRead
+    AnalysisRead,
+    BestSlotsRead
 )
+from app.config import app_settings
+from app.core.slot_index import MAX_HOURS
 from app.core.logger import setup_logger
+from app.core import metrics
 
 logger = setup_logger(__name__)
 
 router = APIRouter()
 
 
+def _split_values(values: Optional[List[str]]) -> Optional[List[str]]:
+    """Accept both repeated (?x=a&x=b) and comma-separated (?x=a,b) list parameters."""
+    if not values:
+        return None
+    return [part.strip() for value in values for part in value.split(",") if part.strip()] or None
+
+
+def _not_modified(request: Request, etag: str, last_modified: str) -> bool:
+    """
+    Evaluate the request's validators against the selected representation (RFC 9110 13.1).
+    If-None-Match takes precedence; If-Modified-Since is only used without it.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: W/"x" matches "x"
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
 @router.get("/analysis_of_calls", response_model=AnalysisRead)
 async def get_analysis_of_calls(
+    request: Request,
     service: AnalysisServiceDep,
-    country_code: Optional[str] = None,
+    country_code: Optional[List[str]] = Query(None, description="One or more country codes, repeated or comma-separated"),
+    windows: Optional[List[str]] = Query(None, description="Only these windows, e.g. seven_days"),
+    weekdays: Optional[List[str]] = Query(None, description="Only these weekdays, e.g. mon,tue"),
+    metrics: Optional[List[str]] = Query(
+        None,
+        description="Only these outcome percentages, averages, duration quantiles and/or sample precision fields, e.g. interested,avg_call_duration",
+    ),
 ):
     """
     Get analysis of calls with optional filters for country.
+    Projections drop the keys that were not requested from each country/window.
     """
     try:
-        result = await service.get_analysis_of_calls(country_code)
+        # Pre-rendered once per result version (or per distinct projection) and
+        # returned as-is, so response_model only documents the schema
+        rendered = await service.get_analysis_of_calls_body(
+            _split_values(country_code),
+            windows=_split_values(windows),
+            weekdays=_split_values(weekdays),
+            metrics=_split_values(metrics),
+        )
 
         # Case 1: No results (service returned None or empty dict)
-        if not result or not result.data:
+        if not rendered:
             logger.warning(f"No analysis data found. country_code={country_code}")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No analysis data found for the given filters."
             )
 
-        return result
+        # Precompressed variant matching Accept-Encoding, identity otherwise
+        encoding, content, etag = rendered.negotiate(request.headers.get("accept-encoding"))
+        headers = {
+            "ETag": etag,
+            "Last-Modified": rendered.last_modified,
+            "Cache-Control": f"public, max-age={app_settings.ANALYSIS_CACHE_MAX_AGE}, must-revalidate",
+            "Vary": "Accept-Encoding",
+        }
+        # Case 2: Client already holds this version
+        if _not_modified(request, etag, rendered.last_modified):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=content, media_type="application/json", headers=headers)
 
     except ValueError as ve:
-        # Case 2: Bad input (e.g., invalid country code)
+        # Case 3: Bad input (e.g., invalid country code)
         logger.warning(f"Invalid input in analysis_of_calls: {ve}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -54,7 +120,37 @@ async def get_analysis_of_calls(
     except HTTPException:
         # Already a FastAPI HTTPException → just bubble up
         raise
-    
+
+
+@router.get("/best_slots", response_model=BestSlotsRead)
+async def get_best_slots(
+    service: AnalysisServiceDep,
+    country_code: str,
+    window: str = "three_months",
+    k: int = Query(3, ge=1, le=MAX_HOURS, description="Number of slots to return"),
+    weekday: Optional[str] = Query(None, description="Only slots on this weekday, e.g. mon"),
+    next_hours: Optional[int] = Query(
+        None, ge=1, le=MAX_HOURS, description="Only the hourly slots in the next N hours from `start`"
+    ),
+    start: Optional[datetime] = Query(None, description="Start of next_hours; defaults to now"),
+):
+    """
+    Best call slots for a country and window, ranked by interested share
+    (ties: lowest not_answered share).
+    """
+    try:
+        return await service.get_best_slots(
+            country_code, window=window, k=k, weekday=weekday, next_hours=next_hours, start=start
+        )
+
+    except ValueError as ve:
+        logger.warning(f"Invalid input in best_slots: {ve}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(ve)
+        )
+
+
 @router.get("/health")
 async def health_check():
     """
@@ -66,4 +162,15 @@ async def health_check():
             "status": "success",
             "message": "API is live"
         }
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Analysis cron metrics in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
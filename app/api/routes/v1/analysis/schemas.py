@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import Dict, Optional
+from pydantic import BaseModel, Field, create_model
+from typing import Dict, List, Optional
+
+from app.config import CronSettings
 
 
 class WeekDays(BaseModel):
@@ -14,10 +16,60 @@ class WeekDays(BaseModel):
 class CompleteAnalysis(WeekDays):
     avg_call_duration: float = 0.0
     avg_number_of_questions_answered: float = 0.0
+    # Answered-call duration in seconds, {"p50": .., "p90": .., "p99": ..}, each
+    # within 1% of the exact value (DurationSketch)
+    call_duration_quantiles: Optional[Dict[str, float]] = Field(
+        None,
+        description=(
+            "p50/p90/p99 answered-call duration in seconds, within 1% of the exact value. "
+            "Null when ANALYSIS_DURATION_QUANTILES is off, and always null in the aggregate "
+            "and rollup analysis modes, which keep no per-call durations"
+        ),
+    )
+    # The same per weekday -> slot
+    slot_call_duration_quantiles: Optional[Dict[str, Dict[str, Dict[str, float]]]] = Field(
+        None, description="call_duration_quantiles per weekday and slot; null in the same cases"
+    )
+    # Set when the window was estimated from an ANALYSIS_SAMPLE_RATE sample of the
+    # calls; None means every call was counted
+    sample_rate: Optional[float] = None
+    sample_size: Optional[int] = None
+    # Mean of the slot widths below weighted by each slot's sampled calls, over
+    # the slots with enough of them, in percentage points
+    interval_width: Optional[float] = None
+    # Widest 95% interval of each slot's three percentages, per weekday -> slot;
+    # None marks a slot with too few sampled calls for one (sampling.MIN_SLOT_SAMPLE)
+    slot_interval_widths: Optional[Dict[str, Dict[str, Optional[float]]]] = None
 
-class CountryAnalysis(BaseModel):
+class BaseCountryAnalysis(BaseModel):
     three_months: CompleteAnalysis
     seven_days: CompleteAnalysis
 
+# Plus one optional field per CronSettings.EXTRA_WINDOWS entry, whatever its name,
+# so every window the cron publishes is validated, served and selectable
+CountryAnalysis = create_model(
+    "CountryAnalysis",
+    __base__=BaseCountryAnalysis,
+    **{name: (Optional[CompleteAnalysis], None) for name in CronSettings().EXTRA_WINDOWS},
+)
+
 class AnalysisRead(BaseModel):
     data: Dict[str, CountryAnalysis]
+
+class RankedSlot(BaseModel):
+    rank: int  # position among all slots of the country and window
+    weekday: str
+    slot: str
+    hour: int
+    interested: float
+    not_interested: float
+    not_answered: float
+    # Sampled windows only: widest 95% interval of the three percentages, in percentage points
+    interval_width: Optional[float] = None
+    # Sampled windows only: too few sampled calls in the slot for an interval
+    insufficient_sample: bool = False
+
+class BestSlotsRead(BaseModel):
+    country_code: str
+    window: str
+    slots: List[RankedSlot]
@@ -1,17 +1,106 @@
-import json
-from pathlib import Path
-from typing import Optional
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlmodel import select
 
 from app.api.routes.v1.analysis.models import JobResponse, JobInvite
-from app.api.routes.v1.analysis.schemas import AnalysisRead
+from app.api.routes.v1.analysis.schemas import AnalysisRead, BestSlotsRead, CountryAnalysis, WeekDays
+from app.api.routes.v1.analysis.cache import AnalysisResultsCache, RenderedBody, RenderedResults, results_cache
+from app.config import app_settings
+from app.core.results_store import current_results_path
+from app.core.slot_index import upcoming_slots
+
+WINDOWS = tuple(CountryAnalysis.model_fields)
+WEEKDAYS = tuple(WeekDays.model_fields)
+OUTCOME_METRICS = ("not_answered", "not_interested", "interested")
+AVERAGE_METRICS = ("avg_call_duration", "avg_number_of_questions_answered")
+QUANTILE_METRICS = ("call_duration_quantiles", "slot_call_duration_quantiles")
+SAMPLE_METRICS = ("sample_rate", "sample_size", "interval_width", "slot_interval_widths")
+WINDOW_METRICS = QUANTILE_METRICS + SAMPLE_METRICS
+# Window metrics keyed by weekday, sliced like the weekdays themselves
+SLOT_METRICS = ("slot_call_duration_quantiles", "slot_interval_widths")
+
+
+def _selection(name: str, requested: Optional[Sequence[str]], allowed: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    """
+    Validate a projection list and return it deduped in `allowed` order, so every
+    permutation of a query shares one projection key. None or empty means everything.
+    """
+    if not requested:
+        return None
+    unknown = [value for value in requested if value not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown {name}: {', '.join(unknown)}. Expected any of: {', '.join(allowed)}")
+    requested = set(requested)
+    return tuple(value for value in allowed if value in requested)
+
+
+def project_window(window: Optional[dict], weekdays, metrics) -> Optional[dict]:
+    """Slice one window object down to the requested weekdays and metrics."""
+    if window is None:
+        return None
+    outcomes = [m for m in metrics if m in OUTCOME_METRICS] if metrics else None
+    averages = [m for m in metrics if m in AVERAGE_METRICS] if metrics else AVERAGE_METRICS
+    window_metrics = [m for m in metrics if m in WINDOW_METRICS] if metrics else WINDOW_METRICS
+
+    projected = {}
+    if outcomes is None or outcomes:
+        for day in weekdays or WEEKDAYS:
+            slots = window.get(day)
+            if slots is not None and outcomes is not None:
+                slots = {label: {m: slot[m] for m in outcomes} for label, slot in slots.items()}
+            projected[day] = slots
+    for metric in averages:
+        projected[metric] = window[metric]
+    for metric in window_metrics:
+        value = window[metric]
+        if metric in SLOT_METRICS and weekdays and value is not None:
+            value = {day: value[day] for day in weekdays if day in value}
+        projected[metric] = value
+    return projected
+
+
+def project_analysis(data: dict, countries, windows, weekdays, metrics) -> dict:
+    """The AnalysisRead payload restricted to the requested countries, windows, weekdays and metrics."""
+    return {
+        "data": {
+            country: {
+                key: project_window(data[country].get(key), weekdays, metrics)
+                for key in windows or WINDOWS
+            }
+            for country in countries or data
+        }
+    }
 
 
 class AnalysisService:
-    def __init__(self, session: AsyncSession):
-        self.session = session
+    def __init__(
+        self,
+        session: Optional[AsyncSession] = None,
+        cache: AnalysisResultsCache = results_cache,
+        session_maker: Optional[async_sessionmaker] = None,
+    ):
+        # Either a ready session, or a maker the session is created from on
+        # first DB access, so file-backed requests never open one
+        self._session = session
+        self._session_maker = session_maker
+        self.cache = cache
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            if self._session_maker is None:
+                raise RuntimeError("AnalysisService has no database session")
+            self._session = self._session_maker()
+        return self._session
+
+    async def close(self) -> None:
+        """Close the session if this service created one."""
+        if self._session is not None and self._session_maker is not None:
+            await self._session.close()
+            self._session = None
 
     async def get_job_response_info(self) -> JobResponse | None:
         result = await self.session.execute(select(JobResponse).limit(1))
@@ -21,23 +110,101 @@ class AnalysisService:
         result = await self.session.execute(select(JobInvite).limit(1))
         return result.scalars().first()
 
-    async def get_analysis_of_calls(self, country_code: Optional[str] = None) -> AnalysisRead:
-        file_path = Path("app/analysis_results/best_times.json")
-
-        if not file_path.exists():
-            raise FileNotFoundError(f"Analysis results file not found at {file_path}")
-
+    async def _rendered_results(self) -> RenderedResults:
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except json.JSONDecodeError as je:
-            raise ValueError(f"Invalid JSON format in {file_path}: {je}") from je
+            return await self.cache.get_rendered()
+        except FileNotFoundError:
+            raise
+        except ValueError as ve:
+            raise ValueError(f"Invalid analysis results in {current_results_path(self.cache.results_dir)}: {ve}") from ve
         except Exception as e:
-            raise RuntimeError(f"Unexpected error while reading {file_path}: {e}") from e
+            raise RuntimeError(f"Unexpected error while reading analysis results: {e}") from e
+
+    async def get_analysis_of_calls(self, country_code: Optional[str] = None) -> AnalysisRead:
+        results = (await self._rendered_results()).results
 
         if country_code:
-            if country_code not in data:
+            if country_code not in results.data:
+                raise ValueError(f"No analysis data found for country_code={country_code}")
+            return AnalysisRead(data={country_code: results.data[country_code]})
+
+        return results
+
+    async def get_analysis_of_calls_body(
+        self,
+        country_codes: Optional[Sequence[str]] = None,
+        windows: Optional[Sequence[str]] = None,
+        weekdays: Optional[Sequence[str]] = None,
+        metrics: Optional[Sequence[str]] = None,
+    ) -> Optional[RenderedBody]:
+        """
+        Pre-rendered JSON body (with ETag and Last-Modified) of get_analysis_of_calls,
+        or None when there is no data. Whole-country and all-country bodies are
+        serialized once per result version; a list of countries or any projection
+        (windows, weekdays, metrics) is assembled from just those slices on first
+        request and memoized until the next version. Requested lists are deduped
+        and put in a fixed order (countries sorted, the rest in schema order), so
+        the body does not depend on the order they were asked for in.
+        """
+        rendered = await self._rendered_results()
+
+        countries = tuple(sorted(set(country_codes))) if country_codes else None
+        for country_code in countries or ():
+            if country_code not in rendered.country_bodies:
                 raise ValueError(f"No analysis data found for country_code={country_code}")
-            return AnalysisRead(data={country_code: data[country_code]})
+        windows = _selection("windows", windows, WINDOWS)
+        weekdays = _selection("weekdays", weekdays, WEEKDAYS)
+        metrics = _selection("metrics", metrics, OUTCOME_METRICS + AVERAGE_METRICS + WINDOW_METRICS)
+
+        if not (windows or weekdays or metrics):
+            if countries is None:
+                return rendered.all_body if rendered.results.data else None
+            if len(countries) == 1:
+                return rendered.country_bodies[countries[0]]
+        elif not rendered.results.data:
+            return None
+
+        return await rendered.projection(
+            (countries, windows, weekdays, metrics),
+            lambda: project_analysis(rendered.data, countries, windows, weekdays, metrics),
+        )
+
+    async def get_best_slots(
+        self,
+        country_code: str,
+        window: str = "three_months",
+        k: int = 3,
+        weekday: Optional[str] = None,
+        next_hours: Optional[int] = None,
+        start: Optional[datetime] = None,
+    ) -> BestSlotsRead:
+        """
+        Top `k` slots of one country and window from the ranked slot index,
+        optionally limited to a weekday and/or to the `next_hours` hourly slots
+        from `start` (default: now in ANALYSIS_TIMEZONE; naive times are taken
+        to be in that timezone).
+        """
+        slot_index = (await self._rendered_results()).slot_index
+
+        if window not in WINDOWS:
+            raise ValueError(f"Unknown window: {window}. Expected one of: {', '.join(WINDOWS)}")
+        if weekday is not None and weekday not in WEEKDAYS:
+            raise ValueError(f"Unknown weekday: {weekday}. Expected one of: {', '.join(WEEKDAYS)}")
+        if window not in slot_index.windows(country_code):
+            raise ValueError(f"No {window} analysis data found for country_code={country_code}")
+
+        slots = None
+        if next_hours is not None:
+            tz = ZoneInfo(app_settings.ANALYSIS_TIMEZONE)
+            if start is None:
+                start = datetime.now(tz)
+            elif start.tzinfo is not None:
+                start = start.astimezone(tz)
+            slots = upcoming_slots(start, next_hours)
 
-        return AnalysisRead(data=data)
+        ranked = slot_index.top(country_code, window, k, weekday=weekday, slots=slots)
+        return BestSlotsRead(
+            country_code=country_code,
+            window=window,
+            slots=[dict(entry, rank=rank) for rank, entry in ranked],
+        )
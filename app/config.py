@@ -1,3 +1,5 @@
+from typing import Dict, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 # from urllib.parse import quote_plus
 
@@ -5,6 +7,19 @@ class AppSettings(BaseSettings):
     APP_NAME: str = "Callify"
     APP_DOMAIN: str = "localhost:8000"
     APP_MODE: str = "dev"  # dev, stage, prod
+    # Cache-Control max-age (seconds) on /analysis_of_calls; clients revalidate with the ETag afterwards
+    ANALYSIS_CACHE_MAX_AGE: int = 60
+    # Timezone call_start_time is recorded in; "now" for /best_slots?next_hours= is taken here
+    ANALYSIS_TIMEZONE: str = "Asia/Kolkata"
+    # Compression levels for the precompressed response bodies (gzip 1-9, brotli 0-11). Higher levels
+    # shrink these JSON bodies by a few percent for several times the CPU on each result reload
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 5
+    # Write log lines as JSON objects instead of the plain text format
+    LOG_JSON: bool = False
+    # Run the analysis scheduler inside the API process. Set to false when the
+    # analysis runs in its own `python -m app.workers` process
+    API_RUN_SCHEDULER: bool = True
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -23,6 +38,17 @@ class DatabaseSettings(BaseSettings):
         MYSQL_USER (str): Username for authenticating with the MySQL server.
         MYSQL_PASSWORD (str): Password for authenticating with the MySQL server.
         MYSQL_DB (str): Name of the MySQL database to connect to.
+        MYSQL_POOL_SIZE (int): Connections kept open per engine.
+        MYSQL_MAX_OVERFLOW (int): Extra connections allowed above the pool size under load.
+        MYSQL_POOL_TIMEOUT (int): Seconds to wait for a free connection before failing.
+        MYSQL_POOL_RECYCLE (int): Seconds after which a connection is replaced, kept below
+            the server's wait_timeout so idle connections are never used after MySQL dropped them.
+        MYSQL_POOL_PRE_PING (bool): Test each connection on checkout and reconnect if it is stale.
+        MYSQL_POOL_WARMUP (bool): Open MYSQL_POOL_SIZE connections at startup instead of on first use.
+        MYSQL_ECHO (Optional[bool]): Log every SQL statement; defaults to on only when APP_MODE is dev.
+        MYSQL_REPLICA_SERVER (Optional[str]): Read replica host for analysis/export reads. Unset
+            means those reads use the primary.
+        MYSQL_REPLICA_PORT (Optional[int]): Read replica port, MYSQL_PORT when unset.
 
     The configuration is loaded from environment variables, optionally using a .env file.
     """
@@ -33,6 +59,17 @@ class DatabaseSettings(BaseSettings):
     MYSQL_PASSWORD: str
     MYSQL_DB: str
 
+    MYSQL_POOL_SIZE: int = 5
+    MYSQL_MAX_OVERFLOW: int = 10
+    MYSQL_POOL_TIMEOUT: int = 30
+    MYSQL_POOL_RECYCLE: int = 1800
+    MYSQL_POOL_PRE_PING: bool = True
+    MYSQL_POOL_WARMUP: bool = True
+    MYSQL_ECHO: Optional[bool] = None
+
+    MYSQL_REPLICA_SERVER: Optional[str] = None
+    MYSQL_REPLICA_PORT: Optional[int] = None
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_ignore_empty=True,
@@ -52,6 +89,21 @@ class DatabaseSettings(BaseSettings):
             f"@{self.MYSQL_SERVER}:{self.MYSQL_PORT}/{self.MYSQL_DB}"
         )
 
+    @property
+    def MYSQL_REPLICA_URL(self) -> Optional[str]:
+        """
+        Async connection string for the read replica, or None when no replica is configured.
+
+        Returns:
+            Optional[str]: The async connection URL for SQLAlchemy.
+        """
+        if not self.MYSQL_REPLICA_SERVER:
+            return None
+        return (
+            f"mysql+aiomysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}"
+            f"@{self.MYSQL_REPLICA_SERVER}:{self.MYSQL_REPLICA_PORT or self.MYSQL_PORT}/{self.MYSQL_DB}"
+        )
+
     @property
     def MYSQL_URL_SYNC(self) -> str:
         """
@@ -99,6 +151,61 @@ class DatabaseSettings(BaseSettings):
 class CronSettings(BaseSettings):
     THREE_MONTHS: int = 90
     SEVEN_DAYS: int = 7
+    # Additional window name -> days; each falls back to three_months like seven_days does
+    # and is served as an optional CountryAnalysis field of the same name
+    EXTRA_WINDOWS: Dict[str, int] = {"one_day": 1, "fourteen_days": 14, "thirty_days": 30}
+
+    # "rows" streams JobInvite rows into Python, "aggregate" lets MySQL group them,
+    # "rollup" folds new rows into jobinvite_hourly_rollup and reads windows from it
+    ANALYSIS_MODE: str = "rows"
+    # Engine for the "rows" mode: "python" (reference loops), "numpy" (vectorized)
+    # or "streaming" (rows folded into per-country day/slot counts as they arrive,
+    # so memory does not grow with call volume)
+    ANALYSIS_ENGINE: str = "python"
+    # Rows mode only: fetch one countryCode shard per connection (up to
+    # ANALYSIS_SHARD_CONCURRENCY at once) and analyze shards in a process pool
+    # of ANALYSIS_PROCESSES workers (0 = one per CPU), started for each run
+    ANALYSIS_PARALLEL: bool = False
+    ANALYSIS_SHARD_CONCURRENCY: int = 4
+    ANALYSIS_PROCESSES: int = 0
+    # Rows mode only: p50/p90/p99 answered-call duration per window and slot,
+    # from mergeable sketches within 1% of the exact value. Off by default since
+    # the per-slot quantiles roughly double the published results. The aggregate
+    # and rollup modes keep only per-slot sums, not durations, so with either of
+    # them the quantile fields are always published as null
+    ANALYSIS_DURATION_QUANTILES: bool = False
+    # Rows mode only: below 1, analyze the same deterministic fraction of calls
+    # (picked by a hash of nid, in MySQL) on every run, and report sample sizes
+    # and 95% interval widths with the slot percentages. Countries whose sample
+    # would hold fewer than ANALYSIS_SAMPLE_MIN_CALLS calls are read in full
+    ANALYSIS_SAMPLE_RATE: float = 1.0
+    ANALYSIS_SAMPLE_MIN_CALLS: int = 20000
+    # Skip a run when the jobinvite fingerprint matches the one saved with the last results
+    ANALYSIS_SKIP_UNCHANGED: bool = True
+    # Window name -> minimum seconds between recomputes, e.g. {"three_months": 86400}
+    # to rebuild the long window nightly while shorter ones follow every run.
+    # Until then the window's last result is republished and the run only scans
+    # as far back as the longest window that is due. Unlisted windows: every run
+    WINDOW_REFRESH_SECONDS: Dict[str, int] = {}
+    # Result versions kept under analysis_results/versions for rollback
+    RESULTS_RETAIN_VERSIONS: int = 5
+    # Dump old results and per-window old buckets to stdout (costly on large result files)
+    ANALYSIS_DEBUG: bool = False
+    # Days before the rollup watermark that are rebuilt each run to catch late updates
+    ROLLUP_RESCAN_DAYS: int = 2
+    # Which process runs the analysis when several API workers/pods schedule it:
+    # "lease" (a row in analysis_lease, falls back to the file lock if the table
+    # can't be used), "file" (an flock on ANALYSIS_LOCK_FILE, single host only)
+    # or "none" (every process runs it)
+    ANALYSIS_LEADER_ELECTION: str = "lease"
+    # Lease length; the leader renews it every third of this while a run lasts
+    ANALYSIS_LEASE_SECONDS: int = 300
+    # Empty means analysis.lock next to the published results
+    ANALYSIS_LOCK_FILE: str = ""
+
+    # Port of the /metrics endpoint `python -m app.workers` serves (the API serves
+    # its own at /api/v1/analysis/metrics); 0 turns it off
+    WORKER_METRICS_PORT: int = 8001
 
     CRON_DAY_OF_WEEK: str = "sat"
     CRON_HOUR: int = 0
@@ -112,6 +219,18 @@ class CronSettings(BaseSettings):
         extra="ignore"
     )
 
+    @property
+    def ANALYSIS_WINDOWS(self) -> Dict[str, int]:
+        """
+        Window name -> days, in output order. three_months comes first since
+        the other windows fall back to it.
+        """
+        return {
+            "three_months": self.THREE_MONTHS,
+            "seven_days": self.SEVEN_DAYS,
+            **self.EXTRA_WINDOWS,
+        }
+
 # These will now be filled by env vars or Docker Compose .env
 app_settings = AppSettings()
 db_settings = DatabaseSettings()  # type: ignore
@@ -1,8 +1,15 @@
 # app/core/logger.py
+import atexit
+import copy
 import logging
+import queue
 import sys
 import os
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional
+
+import orjson
+
 from app.config import AppSettings
 
 app_settings = AppSettings()
@@ -14,31 +21,98 @@ DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 # Directory for log files
 LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 
-def setup_logger(name: str = "app") -> logging.Logger:
-    """Set up and return a logger instance usable across the app."""
-    logger = logging.getLogger(name)
-    logger.setLevel(LOG_LEVEL)
+# Shared by every logger from setup_logger: callers only enqueue records, the
+# listener thread formats them and does the console/file I/O (and rotation)
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+class RecordQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves the traceback on the queued record for the
+    listener's formatter (JsonFormatter's exc_info key), where the stdlib one
+    formats it into the message and drops exc_info/exc_text.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Merge the args now, while they still hold their values at log time
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with time, level, logger and message (traceback included)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry).decode()
+
+
+def build_formatter(json_output: bool = app_settings.LOG_JSON) -> logging.Formatter:
+    return JsonFormatter() if json_output else logging.Formatter(LOG_FORMAT, DATE_FORMAT)
 
-    if not logger.handlers:  # avoid duplicates in reload mode
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
-        logger.addHandler(console_handler)
-
-        # Rotating file handler (max 5MB, keep 5 backups)
-        file_handler = RotatingFileHandler(
-            os.path.join(LOG_DIR, "app.log"),
-            maxBytes=5 * 1024 * 1024,
-            backupCount=5,
-            encoding="utf-8"
-        )
-        file_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
-        logger.addHandler(file_handler)
+
+def build_handlers(log_dir: str = LOG_DIR, stream=sys.stdout, json_output: bool = app_settings.LOG_JSON) -> List[logging.Handler]:
+    """The console and rotating file handlers that do the actual I/O."""
+    os.makedirs(log_dir, exist_ok=True)
+    formatter = build_formatter(json_output)
+
+    # Console handler
+    console_handler = logging.StreamHandler(stream)
+    console_handler.setFormatter(formatter)
+
+    # Rotating file handler (max 5MB, keep 5 backups)
+    file_handler = RotatingFileHandler(
+        os.path.join(log_dir, "app.log"),
+        maxBytes=5 * 1024 * 1024,
+        backupCount=5,
+        encoding="utf-8"
+    )
+    file_handler.setFormatter(formatter)
+    return [console_handler, file_handler]
+
+
+def configure_logging() -> QueueHandler:
+    """Start the logging listener thread once per process and return the shared QueueHandler."""
+    global _queue_handler, _listener
+    if _queue_handler is None:
+        log_queue = queue.SimpleQueue()
+        _queue_handler = RecordQueueHandler(log_queue)
+        _listener = QueueListener(log_queue, *build_handlers(), respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
 
         # Silence noisy loggers
         logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
         logging.getLogger("uvicorn.access").setLevel(logging.INFO)
+    return _queue_handler
+
+
+def stop_logging() -> None:
+    """Write out the records still queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logger(name: str = "app") -> logging.Logger:
+    """Set up and return a logger instance usable across the app."""
+    logger = logging.getLogger(name)
+    logger.setLevel(LOG_LEVEL)
+
+    handler = configure_logging()
+    if handler not in logger.handlers:  # avoid duplicates in reload mode
+        logger.addHandler(handler)
 
     return logger
@@ -0,0 +1,177 @@
+# app/core/metrics.py
+from threading import Lock
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Every metric registers itself here; render() walks it in definition order
+REGISTRY = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels) -> tuple:
+        return tuple(str(labels[label]) for label in self.labelnames)
+
+    def clear(self) -> None:
+        """Drop every label combination, e.g. countries absent from the latest run."""
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self):
+        """Yield (suffix, label pairs, value) for the text exposition."""
+        for key, value in sorted(self._values.items()):
+            yield "", list(zip(self.labelnames, key)), value
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, pairs, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(pairs)} {value}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic counter, optionally split by label values."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Last observed value, optionally split by label values."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts plus sum and count of observations."""
+
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def _samples(self):
+        for key, state in sorted(self._values.items()):
+            pairs = list(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, state["buckets"]):
+                yield "_bucket", pairs + [("le", str(bound))], count
+            yield "_bucket", pairs + [("le", "+Inf")], state["count"]
+            yield "_sum", pairs, state["sum"]
+            yield "_count", pairs, state["count"]
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident memory of this process or its largest finished child (pool workers), 0 if unknown."""
+    if resource is None:
+        return 0
+    # ru_maxrss is in KiB on Linux
+    return 1024 * max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+# ---------------- Analysis cron ---------------- #
+
+ANALYSIS_RUNS = Counter(
+    "analysis_runs_total",
+    "Analysis cron runs by outcome (completed, skipped, empty, failed, not_leader)",
+    ("outcome",),
+)
+ANALYSIS_RUN_SECONDS = Histogram(
+    "analysis_run_duration_seconds",
+    "Wall-clock duration of completed analysis cron runs",
+)
+ANALYSIS_PHASE_SECONDS = Gauge(
+    "analysis_phase_seconds",
+    "Seconds spent in each phase (fetch, bucketing, fallback, write) of the last completed run",
+    ("phase",),
+)
+ANALYSIS_COUNTRY_PHASE_SECONDS = Gauge(
+    "analysis_country_phase_seconds",
+    "Seconds spent per country in each phase of the last completed run",
+    ("country", "phase"),
+)
+ANALYSIS_ROWS = Gauge(
+    "analysis_rows",
+    "jobinvite rows inside the longest window in the last completed run (only those read, when sampled)",
+)
+ANALYSIS_ROWS_PER_SECOND = Gauge(
+    "analysis_rows_per_second",
+    "Rows analyzed per second of fetch and bucketing in the last completed run",
+)
+ANALYSIS_PEAK_MEMORY_BYTES = Gauge(
+    "analysis_peak_memory_bytes",
+    "Peak resident memory of the cron process or its largest pool worker, sampled after the last completed run",
+)
+ANALYSIS_LAST_SUCCESS_TIMESTAMP = Gauge(
+    "analysis_last_success_timestamp_seconds",
+    "Unix time at which the last completed run wrote its results",
+)
+ANALYSIS_SCAN_DAYS = Gauge(
+    "analysis_scan_days",
+    "Days of jobinvite rows scanned by the last completed run (the longest window due for a refresh)",
+)
+ANALYSIS_WINDOW_REFRESHES = Counter(
+    "analysis_window_refreshes_total",
+    "Times each window was recomputed rather than carried over from the previous results",
+    ("window",),
+)
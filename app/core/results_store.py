@@ -0,0 +1,157 @@
+# app/core/results_store.py
+"""
+Versioned analysis results.
+
+Each cron run is written to versions/best_times-<run_id>.json (compact orjson)
+and then made live by atomically replacing current.json, a small manifest naming
+the live version, its source fingerprint and the retained history. Readers only
+ever see a complete file: both writes go to a temp file in the same directory
+followed by os.replace. The pre-versioning best_times.json is still read when no
+manifest exists yet.
+
+The manifest also records, per window, when and from which fingerprint it was
+last computed, since a run may recompute only some windows and carry the
+others over.
+
+Derived artifacts of a run (e.g. the ranked slot index) are written next to it
+as versions/<name>-<run_id>.json and listed under "artifacts" in the manifest
+entry, so they go live, roll back and get pruned together with the results.
+"""
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import orjson
+
+RESULTS_DIR = Path(__file__).resolve().parent.parent / "analysis_results"
+LEGACY_FILE = "best_times.json"
+MANIFEST_FILE = "current.json"
+VERSIONS_DIR = "versions"
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Write `data` to `path` so readers see either the old or the new file, never a partial one."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def read_manifest(results_dir: Path = RESULTS_DIR) -> Optional[dict]:
+    """The current.json manifest, or None before the first versioned run."""
+    path = results_dir / MANIFEST_FILE
+    if not path.exists():
+        return None
+    return orjson.loads(path.read_bytes())
+
+
+def current_results_path(results_dir: Path = RESULTS_DIR, manifest: Optional[dict] = None) -> Path:
+    """File holding the live results: the manifest's version, else the legacy best_times.json."""
+    if manifest is None:
+        manifest = read_manifest(results_dir)
+    if manifest is not None:
+        return results_dir / manifest["file"]
+    return results_dir / LEGACY_FILE
+
+
+def load_results(results_dir: Path = RESULTS_DIR) -> dict:
+    """
+    Parse the live results.
+    Raises FileNotFoundError when there are none and ValueError when they can't be decoded.
+    """
+    path = current_results_path(results_dir)
+    if not path.exists():
+        raise FileNotFoundError(f"Analysis results file not found at {path}")
+    return orjson.loads(path.read_bytes())
+
+
+def load_artifact(name: str, results_dir: Path = RESULTS_DIR, manifest: Optional[dict] = None) -> Optional[dict]:
+    """
+    Parse the live version's `name` artifact, or None when that version was
+    published without one (including the legacy best_times.json).
+    """
+    if manifest is None:
+        manifest = read_manifest(results_dir)
+    file_name = (manifest or {}).get("artifacts", {}).get(name)
+    if file_name is None:
+        return None
+    return orjson.loads((results_dir / file_name).read_bytes())
+
+
+def publish_results(
+    results: dict,
+    run_id: str,
+    fingerprint: Optional[dict] = None,
+    retain: int = 5,
+    results_dir: Path = RESULTS_DIR,
+    artifacts: Optional[Dict[str, dict]] = None,
+    windows: Optional[Dict[str, dict]] = None,
+) -> Path:
+    """
+    Write `results` (and any `artifacts`, name -> payload) as a new version, point
+    current.json at it and delete versions beyond the `retain` most recent.
+    `windows` is the per-window freshness stored in the manifest next to the
+    fingerprint. Returns the path of the new version.
+    """
+    file_name = f"{VERSIONS_DIR}/best_times-{run_id}.json"
+    path = results_dir / file_name
+    atomic_write(path, orjson.dumps(results, default=str))
+    artifact_files = {}
+    for name, payload in (artifacts or {}).items():
+        artifact_files[name] = f"{VERSIONS_DIR}/{name}-{run_id}.json"
+        atomic_write(results_dir / artifact_files[name], orjson.dumps(payload, default=str))
+
+    previous = read_manifest(results_dir) or {}
+    entry = {"run_id": run_id, "file": file_name, "created_at": datetime.now().isoformat()}
+    if artifact_files:
+        entry["artifacts"] = artifact_files
+    history = [entry] + [h for h in previous.get("history", []) if h["run_id"] != run_id]
+    manifest = dict(entry, fingerprint=fingerprint, windows=windows, history=history[:max(retain, 1)])
+    atomic_write(results_dir / MANIFEST_FILE, orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+
+    _prune_versions(
+        results_dir,
+        {f for h in manifest["history"] for f in (h["file"], *h.get("artifacts", {}).values())},
+    )
+    return path
+
+
+def rollback_results(run_id: str, results_dir: Path = RESULTS_DIR) -> dict:
+    """Point current.json back at a retained version. Returns the new manifest."""
+    manifest = read_manifest(results_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No results manifest in {results_dir}")
+    for entry in manifest["history"]:
+        if entry["run_id"] == run_id:
+            break
+    else:
+        raise ValueError(f"Run {run_id} is not among the retained versions")
+    if not (results_dir / entry["file"]).exists():
+        raise FileNotFoundError(f"Version file {entry['file']} is missing")
+
+    # The rolled-back version has no trusted fingerprint or window freshness,
+    # so the next cron run recomputes every window
+    history = [entry] + [h for h in manifest["history"] if h["run_id"] != run_id]
+    manifest = dict(entry, fingerprint=None, history=history)
+    atomic_write(results_dir / MANIFEST_FILE, orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+    return manifest
+
+
+def _prune_versions(results_dir: Path, keep: set) -> None:
+    versions = results_dir / VERSIONS_DIR
+    for path in versions.glob("*.json"):
+        if f"{VERSIONS_DIR}/{path.name}" not in keep:
+            try:
+                path.unlink()
+            except OSError as e:
+                print(f"Could not prune old results {path}: {e}")
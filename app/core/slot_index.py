@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+# Longest "next N hours" lookup: one full week covers every slot
+MAX_HOURS = 24 * 7
+
+
+def slot_hour(label: str) -> int:
+    """Hour of a slot label from get_time_ranges, e.g. "10:01-11:00" -> 10."""
+    return int(label[:2])
+
+
+def rank_window(window: dict) -> List[dict]:
+    """
+    Every (weekday, slot) of one window object, best first: highest interested
+    share, ties broken by the lowest not_answered share, then by weekday and hour
+    so the order is stable between runs. Slots of a sampled window also carry
+    their interval width, or are flagged insufficient_sample when they have none.
+    """
+    widths = window.get("slot_interval_widths") or {}
+    entries = []
+    for day_index, day in enumerate(WEEKDAYS):
+        for label, slot in (window.get(day) or {}).items():
+            hour = slot_hour(label)
+            entry = {
+                "weekday": day,
+                "slot": label,
+                "hour": hour,
+                "interested": slot["interested"],
+                "not_interested": slot["not_interested"],
+                "not_answered": slot["not_answered"],
+            }
+            day_widths = widths.get(day, {})
+            if day_widths.get(label) is not None:
+                entry["interval_width"] = day_widths[label]
+            elif label in day_widths:
+                entry["insufficient_sample"] = True
+            entries.append((-slot["interested"], slot["not_answered"], day_index, hour, entry))
+    entries.sort(key=lambda entry: entry[:4])
+    return [entry[4] for entry in entries]
+
+
+def build_slot_index(results: dict) -> Dict[str, Dict[str, List[dict]]]:
+    """country -> window -> ranked slots, for every window present in the results."""
+    return {
+        country: {
+            window_name: rank_window(window)
+            for window_name, window in windows.items()
+            if window is not None
+        }
+        for country, windows in results.items()
+    }
+
+
+def upcoming_slots(start: datetime, hours: int) -> List[Tuple[str, int]]:
+    """(weekday, hour) of the `hours` hourly slots starting with the one `start` falls in."""
+    start = start.replace(minute=0, second=0, microsecond=0)
+    return [
+        (WEEKDAYS[moment.weekday()], moment.hour)
+        for moment in (start + timedelta(hours=h) for h in range(min(hours, MAX_HOURS)))
+    ]
+
+
+class SlotIndex:
+    """
+    Lookup side of the ranked slot index published by the cron. The per-weekday
+    lists and the slot -> rank map are derived once per result version, so a
+    top-K query is a slice of a pre-sorted list, or a rank lookup per upcoming
+    hour when restricted to a time range.
+    """
+
+    __slots__ = ("ranked", "by_weekday", "ranks")
+
+    def __init__(self, index: Dict[str, Dict[str, List[dict]]]):
+        self.ranked = index
+        self.by_weekday = {}
+        self.ranks = {}
+        for country, windows in index.items():
+            for window, entries in windows.items():
+                days = self.by_weekday[(country, window)] = {day: [] for day in WEEKDAYS}
+                ranks = self.ranks[(country, window)] = {}
+                for rank, entry in enumerate(entries, start=1):
+                    days[entry["weekday"]].append((rank, entry))
+                    ranks[(entry["weekday"], entry["hour"])] = rank
+
+    def windows(self, country: str) -> Tuple[str, ...]:
+        return tuple(self.ranked.get(country, ()))
+
+    def top(
+        self,
+        country: str,
+        window: str,
+        k: int,
+        weekday: Optional[str] = None,
+        slots: Optional[Iterable[Tuple[str, int]]] = None,
+    ) -> List[Tuple[int, dict]]:
+        """
+        The best `k` (rank, entry) pairs for a country and window, optionally
+        restricted to one weekday or to a set of (weekday, hour) slots. Raises
+        KeyError when the country or window is not in the index.
+        """
+        entries = self.ranked[country][window]
+        if slots is not None:
+            ranks = self.ranks[(country, window)]
+            found = sorted({ranks[slot] for slot in slots if slot in ranks})
+            if weekday is not None:
+                found = [rank for rank in found if entries[rank - 1]["weekday"] == weekday]
+            return [(rank, entries[rank - 1]) for rank in found[:k]]
+        if weekday is not None:
+            return self.by_weekday[(country, window)][weekday][:k]
+        return list(enumerate(entries[:k], start=1))
@@ -1,15 +1,31 @@
 # app/db/session.py
 
+import asyncio
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngine, async_sessionmaker
-from app.config import db_settings
-from contextlib import asynccontextmanager
+from app.config import app_settings, db_settings
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    echo = db_settings.MYSQL_ECHO if db_settings.MYSQL_ECHO is not None else app_settings.APP_MODE == "dev"
+    return create_async_engine(
+        url,
+        echo=echo,
+        future=True,
+        pool_size=db_settings.MYSQL_POOL_SIZE,
+        max_overflow=db_settings.MYSQL_MAX_OVERFLOW,
+        pool_timeout=db_settings.MYSQL_POOL_TIMEOUT,
+        pool_recycle=db_settings.MYSQL_POOL_RECYCLE,
+        pool_pre_ping=db_settings.MYSQL_POOL_PRE_PING,
+    )
+
 
 # ✅ Create engine
-engine: AsyncEngine = create_async_engine(
-    db_settings.MYSQL_URL,
-    echo=True,
-    future=True,
+engine: AsyncEngine = _create_engine(db_settings.MYSQL_URL)
+
+# ✅ Read-only engine for analysis/export scans; the primary when no replica is configured
+read_engine: AsyncEngine = (
+    _create_engine(db_settings.MYSQL_REPLICA_URL) if db_settings.MYSQL_REPLICA_URL else engine
 )
 
 # ✅ Create sessionmaker once (correct usage for AsyncSession)
@@ -18,8 +34,50 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False,
 )
 
-# ✅ Properly typed async generator return
-@asynccontextmanager
+read_session_maker = async_sessionmaker(
+    bind=read_engine,
+    expire_on_commit=False,
+)
+
+
+def _engines():
+    return [engine] if read_engine is engine else [engine, read_engine]
+
+
+async def _warm_up(target: AsyncEngine, size: int) -> None:
+    # Hold `size` connections at once so the pool really opens that many, then return them
+    connections = await asyncio.gather(*(target.connect() for _ in range(size)), return_exceptions=True)
+    errors = [c for c in connections if isinstance(c, BaseException)]
+    for connection in connections:
+        if not isinstance(connection, BaseException):
+            await connection.close()
+    if errors:
+        raise errors[0]
+
+
+async def warm_up_pools() -> None:
+    """
+    Open MYSQL_POOL_SIZE connections per engine so the first requests and the
+    first cron run don't pay for connection setup. Failures are reported, not
+    raised: the file-backed endpoints keep working without the database.
+    """
+    if not db_settings.MYSQL_POOL_WARMUP:
+        return
+    for target in _engines():
+        try:
+            await _warm_up(target, db_settings.MYSQL_POOL_SIZE)
+            print(f"DB pool warmed ✅ {target.url.host} ({db_settings.MYSQL_POOL_SIZE} connections)")
+        except Exception as e:
+            print(f"DB pool warm-up failed for {target.url.host}: {e}")
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection, e.g. on shutdown."""
+    for target in _engines():
+        await target.dispose()
+
+
+# ✅ Properly typed async generator return (a FastAPI yield dependency)
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        yield session
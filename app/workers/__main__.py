@@ -0,0 +1,75 @@
+# app/workers/__main__.py
+"""
+Standalone analysis worker, so the analysis's CPU and memory spikes stay out of
+the API process (run the API with API_RUN_SCHEDULER=false).
+
+    python -m app.workers                     # run the scheduler until SIGINT/SIGTERM
+    python -m app.workers --run-once          # one analysis run, then exit
+    python -m app.workers --run-once --force  # ... even if the source data is unchanged
+
+While it runs the scheduler, the worker serves its cron metrics at
+http://<host>:WORKER_METRICS_PORT/metrics.
+"""
+import argparse
+import asyncio
+import signal
+import sys
+
+from app.core.metrics import ANALYSIS_RUNS
+from app.db.session import warm_up_pools
+from app.workers.utils.find_and_analyze_cron import run_best_times_job
+from app.workers.metrics_server import start_metrics_server
+from app.workers.worker import cron_settings, scheduler, schedule_analysis, stop_worker
+
+
+async def run_once(force: bool) -> int:
+    failed = ANALYSIS_RUNS.value(outcome="failed")
+    try:
+        await run_best_times_job(force=force)
+    finally:
+        await stop_worker()
+    return 1 if ANALYSIS_RUNS.value(outcome="failed") > failed else 0
+
+
+async def serve() -> int:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows: Ctrl+C still raises KeyboardInterrupt
+            pass
+
+    metrics_server = None
+    if cron_settings.WORKER_METRICS_PORT:
+        metrics_server = await start_metrics_server("0.0.0.0", cron_settings.WORKER_METRICS_PORT)
+        print(f"Metrics served on port {cron_settings.WORKER_METRICS_PORT} ✅")
+
+    await warm_up_pools()
+    schedule_analysis(scheduler)
+    scheduler.start()
+    print("Scheduler started ✅")
+    try:
+        await stop.wait()
+    finally:
+        scheduler.shutdown()
+        print("Scheduler stopped ❌")
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+        await stop_worker()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.workers", description="Analysis worker")
+    parser.add_argument("--run-once", action="store_true", help="Run the analysis once and exit")
+    parser.add_argument("--force", action="store_true", help="With --run-once: recompute even if the data is unchanged")
+    args = parser.parse_args()
+    if args.force and not args.run_once:
+        parser.error("--force requires --run-once")
+    return asyncio.run(run_once(args.force) if args.run_once else serve())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+# app/workers/metrics_server.py
+"""
+/metrics for the standalone worker, which has no API to serve it: the same
+metrics.render() output as the API's GET /api/v1/analysis/metrics. Runs on the
+worker's event loop, so scrapes never race the cron updating the metrics.
+"""
+import asyncio
+
+from app.core import metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        # Headers are not needed; read up to the blank line that ends them
+        while (await reader.readline()).strip():
+            pass
+        if len(request_line) >= 2 and request_line[0] == "GET" and request_line[1].split("?")[0] == "/metrics":
+            status, content_type, body = "200 OK", CONTENT_TYPE, metrics.render().encode()
+        else:
+            status, content_type, body = "404 Not Found", "text/plain; charset=utf-8", b"Not Found\n"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str, port: int) -> asyncio.AbstractServer:
+    """Listen for GET /metrics on `host`:`port`; close the returned server to stop."""
+    return await asyncio.start_server(_handle, host, port)
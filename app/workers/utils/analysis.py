@@ -0,0 +1,176 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import NamedTuple, Optional
+import statistics
+
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# ---------------- Utility Functions ---------------- #
+
+class CallRecord(NamedTuple):
+    """The only JobInvite columns the analysis reads, as a plain tuple."""
+    call_start_time: datetime
+    total_call: int
+    DTMF: Optional[str]
+
+def get_time_ranges():
+    """Generate hourly ranges like 10:01-11:00."""
+    return [(h, f"{h:02d}:01-{(h+1) % 24:02d}:00") for h in range(24)]
+
+def classify_call(total_call):
+    """Classify call based on duration."""
+    if not total_call or total_call == 0:
+        return "not_answered"
+    elif total_call < 120:
+        return "not_interested"
+    return "interested"
+
+def bucketize_calls(rows):
+    """Group calls into weekday + time range buckets with percentages."""
+    ranges = get_time_ranges()
+    weekmap = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+    data = defaultdict(lambda: defaultdict(dict))
+
+    # First pass: Count calls
+    for r in rows:
+        if not r.call_start_time:
+            continue
+        weekday = weekmap[r.call_start_time.weekday()]
+        hour = r.call_start_time.hour
+        _, range_label = ranges[hour]
+        cls = classify_call(r.total_call)
+        
+        # Initialize dict for this time slot if needed
+        if range_label not in data[weekday]:
+            data[weekday][range_label] = {"not_answered": 0, "not_interested": 0, "interested": 0}
+        
+        data[weekday][range_label][cls] += 1
+
+    return counts_to_percentages(data)
+
+def counts_to_percentages(data):
+    """Convert weekday -> slot -> outcome counts into percentages, dropping empty slots."""
+    for weekday in list(data.keys()):
+        for range_label in list(data[weekday].keys()):
+            counts = data[weekday][range_label]
+            total = sum(counts.values())
+            
+            if total > 0:
+                # Convert to percentages, keeping all values even if 0
+                data[weekday][range_label] = {
+                    k: round((v / total) * 100, 2)
+                    for k, v in counts.items()
+                }
+            else:
+                # Only remove time slot if all values are 0
+                del data[weekday][range_label]
+                
+        # Remove empty weekdays
+        if not data[weekday]:
+            del data[weekday]
+            
+    return data
+
+def count_questions_from_dtmf(dtmf: str) -> int:
+    """Old method: count number of comma-separated non-empty entries."""
+    if not dtmf:
+        return 0
+    return sum(1 for p in str(dtmf).split(",") if p.strip() != "")
+
+def mean_of_sum(total, n):
+    """Mean of `n` integers summing to `total`, typed exactly like statistics.mean."""
+    return total // n if total % n == 0 else total / n
+
+def calculate_averages(rows):
+    """Calculate average call duration and questions answered, in one pass without keeping the values."""
+    duration_sum = duration_n = dtmf_sum = dtmf_n = 0
+    for r in rows:
+        total_call = getattr(r, "total_call", None)
+        if total_call and total_call > 0:
+            duration_sum += total_call
+            duration_n += 1
+        dtmf = getattr(r, "DTMF", None)
+        if dtmf:
+            dtmf_sum += count_questions_from_dtmf(dtmf)
+            dtmf_n += 1
+    return averages_from_sums(duration_sum, duration_n, dtmf_sum, dtmf_n)
+
+def averages_from_sums(duration_sum, duration_n, dtmf_sum, dtmf_n):
+    """Same output as calculate_averages, from pre-aggregated sums and counts."""
+    return {
+        "avg_call_duration": round(mean_of_sum(duration_sum, duration_n), 2) if duration_n else 0.0,
+        "avg_number_of_questions_answered": round(mean_of_sum(dtmf_sum, dtmf_n), 2) if dtmf_n else 0.0,
+    }
+
+def average_missing_day(all_weekdays):
+    """Average across available weekdays to synthesize missing one."""
+    ranges = get_time_ranges()
+    result = {}
+    for _, range_label in ranges:
+        values = [all_weekdays[w][range_label] for w in all_weekdays if range_label in all_weekdays[w]]
+        if not values:
+            result[range_label] = {"not_answered": 0.0, "not_interested": 0.0, "interested": 0.0}
+            continue
+
+        avg_counts = {
+            "not_answered": statistics.mean(v["not_answered"] for v in values),
+            "not_interested": statistics.mean(v["not_interested"] for v in values),
+            "interested": statistics.mean(v["interested"] for v in values),
+        }
+
+        # normalize
+        total = sum(avg_counts.values())
+        if total > 0:
+            avg_counts = {k: round((v / total) * 100, 2) for k, v in avg_counts.items()}
+
+        result[range_label] = avg_counts
+    return result
+
+def fix_missing_days(buckets, old_buckets, window="three_months", fallback_from=None):
+    """
+    Apply rules:
+      - Missing weekdays → average / old data
+      - Weekdays with <4 slots → pull from fallback (shorter windows→3m, 3m→old, fallback to average if no old data)
+    """
+    weekmap = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+    existing_days = set(buckets.keys())
+    missing_days = [d for d in weekmap if d not in existing_days]
+
+    logger.debug(
+        "Window %s: existing days %s, missing days %s, old buckets %s",
+        window, sorted(existing_days), missing_days, list(old_buckets or ()),
+    )
+
+    # Missing weekdays
+    if len(missing_days) == 1:
+        buckets[missing_days[0]] = average_missing_day(buckets)
+        logger.debug("Added missing day %s using average", missing_days[0])
+    elif len(missing_days) >= 2:
+        for md in missing_days:
+            if old_buckets and md in old_buckets:
+                buckets[md] = old_buckets[md]
+                logger.debug("Added missing day %s from old_buckets", md)
+            else:
+                buckets[md] = average_missing_day(buckets)
+                logger.debug("Added missing day %s using average", md)
+
+    # Weak weekdays (<4 slots)
+    for wd in weekmap:
+        if wd not in buckets:
+            continue
+        logger.debug("Checking %s with %d slots", wd, len(buckets[wd]))
+        if len(buckets[wd]) < 4:
+            if window != "three_months" and fallback_from and wd in fallback_from:
+                buckets[wd] = fallback_from[wd]
+                logger.debug("Replaced %s from fallback_from (three_months)", wd)
+            elif window == "three_months" and old_buckets and wd in old_buckets:
+                buckets[wd] = old_buckets[wd]
+                logger.debug("Replaced %s from old_buckets", wd)
+            else:
+                buckets[wd] = average_missing_day(buckets)
+                logger.debug("Replaced %s using average_missing_day due to missing old_buckets data", wd)
+
+    return buckets
@@ -1,249 +1,635 @@
-from datetime import timedelta
-from sqlalchemy import select, func
-from collections import defaultdict
-import statistics
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+from sqlalchemy import select, func, or_, case
+import asyncio
 import json
-import os
+import multiprocessing
+import time
 import uuid
 
 from app.api.routes.v1.analysis.models import JobInvite
-from app.db.session import async_session_maker
+from app.db.session import async_session_maker, read_session_maker
 from app.config import CronSettings
+from app.core.results_store import read_manifest, current_results_path, load_results, publish_results
+from app.core.slot_index import build_slot_index
+from app.core.metrics import (
+    ANALYSIS_RUNS,
+    ANALYSIS_RUN_SECONDS,
+    ANALYSIS_PHASE_SECONDS,
+    ANALYSIS_COUNTRY_PHASE_SECONDS,
+    ANALYSIS_ROWS,
+    ANALYSIS_ROWS_PER_SECOND,
+    ANALYSIS_PEAK_MEMORY_BYTES,
+    ANALYSIS_LAST_SUCCESS_TIMESTAMP,
+    ANALYSIS_SCAN_DAYS,
+    ANALYSIS_WINDOW_REFRESHES,
+    peak_rss_bytes,
+)
+from app.workers.utils.analysis import (
+    CallRecord,
+    fix_missing_days,
+)
+from app.workers.utils.vectorized import (
+    CallArrays,
+    CallColumns,
+    analyze_windows_np,
+)
+from app.workers.utils.sql_aggregate import fetch_aggregated_windows
+from app.workers.utils.rollup import refresh_rollup, load_rollup_windows
+from app.workers.utils.sampling import in_sample
+from app.workers.utils.windows import DailySlotCounts
+from app.workers.utils.fingerprint import SETTINGS_KEYS, settings_fingerprint, source_fingerprint
+from app.workers.utils.leader import leadership
 
 cron_days_settings = CronSettings()
 
-# ---------------- Utility Functions ---------------- #
+# ---------------- Core Analysis ---------------- #
 
-def get_time_ranges():
-    """Generate hourly ranges like 10:01-11:00."""
-    return [(h, f"{h:02d}:01-{(h+1) % 24:02d}:00") for h in range(24)]
+async def stream_country_columns(session, start_date, latest_date, *conditions):
+    """
+    Stream calls since `start_date` into per-country CallArrays for the NumPy engine.
+    MySQL computes the weekday/hour slot and the age in seconds, so no datetime
+    objects are unpacked in Python. Extra `conditions` narrow the scan (e.g. to a shard).
+    """
+    started = JobInvite.call_start_time
+    stmt = select(
+        JobInvite.countryCode,
+        func.weekday(started) * 24 + func.hour(started),
+        func.to_seconds(latest_date) - func.to_seconds(started),
+        JobInvite.total_call,
+        JobInvite.DTMF,
+    ).where(started >= start_date, *conditions)
+
+    columns_by_code = {}
+    result = await session.stream(stmt.execution_options(yield_per=1000))
+    async for country_code, slot, age, total_call, dtmf in result.tuples():
+        columns = columns_by_code.get(country_code)
+        if columns is None:
+            columns = columns_by_code[country_code] = CallColumns()
+        columns.append(slot, age, total_call, dtmf)
+
+    # Normalize country code to string
+    return {str(code): CallArrays.from_columns(columns) for code, columns in columns_by_code.items()}
+
+async def stream_country_records(session, start_date, *conditions):
+    """
+    Stream the analysis columns since `start_date` as CallRecord tuples grouped by country.
+    Selecting four columns instead of the full JobInvite entity avoids hydrating ORM
+    instances (and COMMENT/email/name strings) for every call.
+    """
+    stmt = select(
+        JobInvite.countryCode,
+        JobInvite.call_start_time,
+        JobInvite.total_call,
+        JobInvite.DTMF,
+    ).where(JobInvite.call_start_time >= start_date, *conditions)
+
+    records_by_code = {}
+    result = await session.stream(stmt.execution_options(yield_per=1000))
+    async for country_code, call_start_time, total_call, dtmf in result.tuples():
+        records = records_by_code.get(country_code)
+        if records is None:
+            records = records_by_code[country_code] = []
+        records.append(CallRecord(call_start_time, total_call, dtmf))
+
+    # Normalize country code to string
+    return {str(code): records for code, records in records_by_code.items()}
+
+async def stream_country_counts(session, start_date, latest_date, *conditions):
+    """
+    Fold calls since `start_date` into one DailySlotCounts per country as they stream
+    in; no row outlives its loop iteration, so memory is bounded by countries x
+    day offsets x slots rather than by the number of calls.
+    """
+    stmt = select(
+        JobInvite.countryCode,
+        JobInvite.call_start_time,
+        JobInvite.total_call,
+        JobInvite.DTMF,
+    ).where(JobInvite.call_start_time >= start_date, *conditions)
+
+    counts_by_code = {}
+    result = await session.stream(stmt.execution_options(yield_per=1000))
+    async for country_code, call_start_time, total_call, dtmf in result.tuples():
+        daily = counts_by_code.get(country_code)
+        if daily is None:
+            daily = counts_by_code[country_code] = DailySlotCounts(
+                latest_date, sketch_durations=cron_days_settings.ANALYSIS_DURATION_QUANTILES
+            )
+        daily.add(call_start_time, total_call, dtmf)
+
+    # Normalize country code to string
+    return {str(code): daily for code, daily in counts_by_code.items()}
+
+async def stream_country_payloads(session, start_date, latest_date, *conditions):
+    """Per-country calls since `start_date` in the form the configured ANALYSIS_ENGINE analyzes."""
+    if cron_days_settings.ANALYSIS_ENGINE == "numpy":
+        return await stream_country_columns(session, start_date, latest_date, *conditions)
+    if cron_days_settings.ANALYSIS_ENGINE == "streaming":
+        return await stream_country_counts(session, start_date, latest_date, *conditions)
+    return await stream_country_records(session, start_date, *conditions)
+
+def analyze_country(payload, latest_date, window_days, sketch_durations=False, sample_rate=None):
+    """
+    Per-window (buckets, avgs) for one country's CallArrays (NumPy engine),
+    DailySlotCounts (streaming engine) or CallRecord list (Python engine), with
+    the duration quantile fields when `sketch_durations` is set (a DailySlotCounts
+    carries its own setting) and the precision fields when the payload is a
+    `sample_rate` sample. Module-level so a process pool can run it.
+    """
+    if isinstance(payload, CallArrays):
+        return analyze_windows_np(payload, window_days, sketch_durations=sketch_durations, sample_rate=sample_rate)
+    if isinstance(payload, DailySlotCounts):
+        return payload.windows(window_days, sample_rate=sample_rate)
+    # One pass into day-offset buckets; windows are running totals
+    daily = DailySlotCounts(latest_date, sketch_durations=sketch_durations)
+    for r in payload:
+        daily.add(r.call_start_time, r.total_call, r.DTMF)
+    return daily.windows(window_days, sample_rate=sample_rate)
+
+async def list_countries(session, start_date):
+    """Country codes with calls since `start_date`, in first-seen (MIN(nid)) order."""
+    stmt = (
+        select(JobInvite.countryCode)
+        .where(JobInvite.call_start_time >= start_date)
+        .group_by(JobInvite.countryCode)
+        .order_by(func.min(JobInvite.nid))
+    )
+    return list((await session.execute(stmt)).scalars())
+
+class SamplePlan(NamedTuple):
+    """How a rows-mode scan samples the calls; see sample_plan."""
+    # None when every call is read
+    rate: Optional[float]
+    # Countries read in full
+    exact: List
+    # Every country, in first-seen (MIN(nid)) order like list_countries; None when not sampling
+    countries: Optional[List]
+    # Rows the sampled scan reads; None when not sampling
+    rows: Optional[int]
+
+async def sample_plan(session, start_date):
+    """
+    The SamplePlan for a rows-mode scan since `start_date`, sampling only when
+    ANALYSIS_SAMPLE_RATE is below 1. Countries whose sample would hold fewer
+    than ANALYSIS_SAMPLE_MIN_CALLS calls are too sparse to sample and are read
+    in full. One GROUP BY gives those, the country order and the rows read.
+    """
+    sample_rate = cron_days_settings.ANALYSIS_SAMPLE_RATE
+    if sample_rate >= 1:
+        return SamplePlan(None, [], None, None)
+    stmt = (
+        select(
+            JobInvite.countryCode,
+            func.count(),
+            func.sum(case((in_sample(sample_rate), 1), else_=0)),
+        )
+        .where(JobInvite.call_start_time >= start_date)
+        .group_by(JobInvite.countryCode)
+        .order_by(func.min(JobInvite.nid))
+    )
+    countries, exact, rows = [], [], 0
+    for country_code, count, sampled in await session.execute(stmt):
+        countries.append(country_code)
+        if count * sample_rate < cron_days_settings.ANALYSIS_SAMPLE_MIN_CALLS:
+            exact.append(country_code)
+            rows += count
+        else:
+            rows += int(sampled)
+    print(f"Sampling {sample_rate:.1%} of calls; read in full: {exact}")
+    return SamplePlan(sample_rate, exact, countries, rows)
+
+def country_condition(country_code):
+    if country_code is None:
+        return JobInvite.countryCode.is_(None)
+    return JobInvite.countryCode == country_code
+
+async def fetch_country_shard(country_code, start_date, latest_date, semaphore, sample_rate=None):
+    """
+    Fetch one country's rows (or their `sample_rate` sample) on its own
+    connection, at most ANALYSIS_SHARD_CONCURRENCY at a time.
+    """
+    conditions = [country_condition(country_code)]
+    if sample_rate is not None:
+        conditions.append(in_sample(sample_rate))
+    async with semaphore:
+        async with read_session_maker() as session:
+            fetched = await stream_country_payloads(session, start_date, latest_date, *conditions)
+    return fetched.get(str(country_code))
+
+async def analyze_countries_parallel(
+    countries, start_date, latest_date, window_days, country_phases, sample_rate=None, exact=()
+):
+    """
+    Fetch every country shard concurrently and analyze each in a process pool as soon
+    as it arrives, keeping CPU-bound work off the event loop. Results come back
+    in `countries` order; per-country fetch/bucketing seconds go into `country_phases`.
+    With a `sample_rate`, countries other than the `exact` ones are sampled.
+    """
+    semaphore = asyncio.Semaphore(cron_days_settings.ANALYSIS_SHARD_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+    # spawn: never fork a process holding the event loop and open DB sockets
+    pool = ProcessPoolExecutor(
+        max_workers=cron_days_settings.ANALYSIS_PROCESSES or None,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
 
-def classify_call(total_call):
-    """Classify call based on duration."""
-    if not total_call or total_call == 0:
-        return "not_answered"
-    elif total_call < 120:
-        return "not_interested"
-    return "interested"
+    async def run(country_code):
+        started = time.perf_counter()
+        rate = None if country_code in exact else sample_rate
+        payload = await fetch_country_shard(country_code, start_date, latest_date, semaphore, rate)
+        fetched = time.perf_counter()
+        country_phases[(str(country_code), "fetch")] = fetched - started
+        if payload is None:
+            return None
+        windows = await loop.run_in_executor(
+            pool,
+            analyze_country,
+            payload,
+            latest_date,
+            window_days,
+            cron_days_settings.ANALYSIS_DURATION_QUANTILES,
+            rate,
+        )
+        country_phases[(str(country_code), "bucketing")] = time.perf_counter() - fetched
+        return windows
+
+    tasks = [asyncio.create_task(run(code)) for code in countries]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # One shard failed (or the run was cancelled): stop the others, and let
+        # them close their sessions, before the pool goes away
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        # shutdown waits for the workers to exit; keep that off the event loop
+        await asyncio.to_thread(pool.shutdown, cancel_futures=True)
 
-def bucketize_calls(rows):
-    """Group calls into weekday + time range buckets with percentages."""
-    ranges = get_time_ranges()
-    weekmap = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+    return {
+        str(code): windows
+        for code, windows in zip(countries, results)
+        if windows is not None
+    }
 
-    data = defaultdict(lambda: defaultdict(dict))
+def build_country_results(country, windows, old_data, debug=False, reused=()):
+    """
+    Apply fallback rules to one country's per-window (buckets, avgs) pairs.
+    `windows` must list three_months first; every other window falls back to it.
+    Windows named in `reused` were not recomputed and keep their previous result
+    as-is (a reused three_months is still the fallback for the others).
+    `debug` dumps the old buckets used for each window.
+    """
+    old_country = old_data.get(str(country), {})
+    country_results = {key: old_country[key] for key in reused if key in old_country}
+    for key, (buckets, avgs) in windows.items():
+        print(f"Processing window: {key} for country: {country}")
+
+        # old buckets for fallback, normalize country code
+        old_buckets = old_data.get(str(country), {}).get(key, {})
+        if debug:
+            print(f"Old buckets for {country}/{key}: {json.dumps(old_buckets, indent=2)}")
+        fallback_from = country_results.get("three_months", {}) if key != "three_months" else None
+
+        # Apply fix rules
+        buckets = fix_missing_days(buckets, old_buckets, window=key, fallback_from=fallback_from)
+
+        # Special case: if a shorter window is completely empty
+        if key != "three_months" and not buckets:
+            buckets = old_buckets or country_results.get("three_months", {})
+
+        window_obj = dict(buckets)
+        window_obj.update(avgs)
+        country_results[key] = window_obj
+    return country_results
+
+def record_run_metrics(phases, country_phases, rows, run_seconds):
+    """Publish a completed run's timings, throughput and memory."""
+    ANALYSIS_RUNS.inc(outcome="completed")
+    ANALYSIS_RUN_SECONDS.observe(run_seconds)
+    for phase, seconds in phases.items():
+        ANALYSIS_PHASE_SECONDS.set(seconds, phase=phase)
+    ANALYSIS_COUNTRY_PHASE_SECONDS.clear()
+    for (country, phase), seconds in country_phases.items():
+        ANALYSIS_COUNTRY_PHASE_SECONDS.set(seconds, country=country, phase=phase)
+    ANALYSIS_ROWS.set(rows)
+    busy = phases["fetch"] + (0 if cron_days_settings.ANALYSIS_PARALLEL else phases["bucketing"])
+    ANALYSIS_ROWS_PER_SECOND.set(rows / busy if busy > 0 else 0)
+    ANALYSIS_PEAK_MEMORY_BYTES.set(peak_rss_bytes())
+    ANALYSIS_LAST_SUCCESS_TIMESTAMP.set(time.time())
+    print(
+        f"Run timings: " + ", ".join(f"{phase}={seconds:.2f}s" for phase, seconds in phases.items())
+        + f", total={run_seconds:.2f}s, rows={rows}"
+    )
 
-    # First pass: Count calls
-    for r in rows:
-        if not r.call_start_time:
-            continue
-        weekday = weekmap[r.call_start_time.weekday()]
-        hour = r.call_start_time.hour
-        _, range_label = ranges[hour]
-        cls = classify_call(r.total_call)
-        
-        # Initialize dict for this time slot if needed
-        if range_label not in data[weekday]:
-            data[weekday][range_label] = {"not_answered": 0, "not_interested": 0, "interested": 0}
-        
-        data[weekday][range_label][cls] += 1
-
-    # Second pass: Convert to percentages and clean up empty slots
-    for weekday in list(data.keys()):
-        for range_label in list(data[weekday].keys()):
-            counts = data[weekday][range_label]
-            total = sum(counts.values())
-            
-            if total > 0:
-                # Convert to percentages, keeping all values even if 0
-                data[weekday][range_label] = {
-                    k: round((v / total) * 100, 2)
-                    for k, v in counts.items()
+async def fetch_country_windows(session, latest_date, window_days, phases, country_phases):
+    """
+    Per-country {window: (buckets, avgs)} for `window_days` with the configured
+    ANALYSIS_MODE/ANALYSIS_ENGINE, scanning only as far back as the longest of
+    them. Fills in the fetch/bucketing timings. Returns them with the number
+    of rows a sampled scan read (None when it read every row), or None after
+    reporting a failed run.
+    """
+    start_date = latest_date - timedelta(days=max(window_days.values()))
+    phase_started = time.perf_counter()
+    rows = None
+    if cron_days_settings.ANALYSIS_MODE == "aggregate":
+        try:
+            country_windows = await fetch_aggregated_windows(session, latest_date, window_days)
+            # Bucketing happens inside MySQL
+            phases["fetch"] = time.perf_counter() - phase_started
+        except Exception as e:
+            print(f"Error fetching aggregated data: {e}")
+            ANALYSIS_RUNS.inc(outcome="failed")
+            return None
+    elif cron_days_settings.ANALYSIS_MODE == "rollup":
+        try:
+            await refresh_rollup(session, latest_date)
+            country_windows = await load_rollup_windows(session, latest_date, window_days)
+            phases["fetch"] = time.perf_counter() - phase_started
+        except Exception as e:
+            print(f"Error refreshing rollup: {e}")
+            ANALYSIS_RUNS.inc(outcome="failed")
+            return None
+    elif cron_days_settings.ANALYSIS_PARALLEL:
+        try:
+            plan = await sample_plan(session, start_date)
+            rows = plan.rows
+            countries = plan.countries if plan.rate is not None else await list_countries(session, start_date)
+            country_windows = await analyze_countries_parallel(
+                countries, start_date, latest_date, window_days, country_phases, plan.rate, set(plan.exact)
+            )
+            # Shards are fetched and bucketed concurrently: fetch is wall time,
+            # bucketing the summed per-country pool time
+            phases["fetch"] = time.perf_counter() - phase_started
+            phases["bucketing"] = sum(
+                seconds for (_, phase), seconds in country_phases.items() if phase == "bucketing"
+            )
+        except Exception as e:
+            print(f"Error fetching data: {e}")
+            ANALYSIS_RUNS.inc(outcome="failed")
+            return None
+    else:
+        try:
+            plan = await sample_plan(session, start_date)
+            rows = plan.rows
+            conditions = ()
+            if plan.rate is not None:
+                # Sampled rows plus every row of the sparse countries, in one scan
+                conditions = (or_(in_sample(plan.rate), *(country_condition(code) for code in plan.exact)),)
+            country_data = await stream_country_payloads(session, start_date, latest_date, *conditions)
+            if plan.rate is not None:
+                # Keep the countries in the order the full data would list them
+                country_data = {
+                    str(code): country_data[str(code)] for code in plan.countries if str(code) in country_data
                 }
-            else:
-                # Only remove time slot if all values are 0
-                del data[weekday][range_label]
-                
-        # Remove empty weekdays
-        if not data[weekday]:
-            del data[weekday]
-            
-    return data
-
-def count_questions_from_dtmf(dtmf: str) -> int:
-    """Old method: count number of comma-separated non-empty entries."""
-    if not dtmf:
-        return 0
-    return sum(1 for p in str(dtmf).split(",") if p.strip() != "")
-
-def calculate_averages(rows):
-    """Calculate average call duration and questions answered."""
-    durations = [r.total_call for r in rows if getattr(r, "total_call", None) and r.total_call > 0]
-    dtmf_counts = [count_questions_from_dtmf(getattr(r, "DTMF", "")) for r in rows if getattr(r, "DTMF", None)]
-
-    return {
-        "avg_call_duration": round(statistics.mean(durations), 2) if durations else 0.0,
-        "avg_number_of_questions_answered": round(statistics.mean(dtmf_counts), 2) if dtmf_counts else 0.0,
+        except Exception as e:
+            print(f"Error fetching data: {e}")
+            ANALYSIS_RUNS.inc(outcome="failed")
+            return None
+
+        phases["fetch"] = time.perf_counter() - phase_started
+        phase_started = time.perf_counter()
+        exact_keys = {str(code) for code in plan.exact}
+        country_windows = {}
+        for country, payload in country_data.items():
+            country_started = time.perf_counter()
+            country_windows[country] = analyze_country(
+                payload,
+                latest_date,
+                window_days,
+                cron_days_settings.ANALYSIS_DURATION_QUANTILES,
+                None if country in exact_keys else plan.rate,
+            )
+            country_phases[(country, "bucketing")] = time.perf_counter() - country_started
+        phases["bucketing"] = time.perf_counter() - phase_started
+
+    return country_windows, rows
+
+
+def window_freshness(manifest, window_days):
+    """
+    Per-window freshness of the live results: when, in which run and against
+    which source fingerprint each window was last computed. Manifests written
+    before per-window tracking count every window as computed by their run.
+    """
+    if not manifest:
+        return {}
+    if manifest.get("windows") is not None:
+        return manifest["windows"]
+    if manifest.get("fingerprint") is None:
+        return {}
+    computed = {
+        "computed_at": manifest["created_at"],
+        "run_id": manifest["run_id"],
+        "latest_call": manifest["fingerprint"]["max_call_start_time"],
+        "fingerprint": manifest["fingerprint"],
     }
+    return {key: computed for key in window_days}
 
-def average_missing_day(all_weekdays):
-    """Average across available weekdays to synthesize missing one."""
-    ranges = get_time_ranges()
-    result = {}
-    for _, range_label in ranges:
-        values = [all_weekdays[w][range_label] for w in all_weekdays if range_label in all_weekdays[w]]
-        if not values:
-            result[range_label] = {"not_answered": 0.0, "not_interested": 0.0, "interested": 0.0}
-            continue
-
-        avg_counts = {
-            "not_answered": statistics.mean(v["not_answered"] for v in values),
-            "not_interested": statistics.mean(v["not_interested"] for v in values),
-            "interested": statistics.mean(v["interested"] for v in values),
-        }
 
-        # normalize
-        total = sum(avg_counts.values())
-        if total > 0:
-            avg_counts = {k: round((v / total) * 100, 2) for k, v in avg_counts.items()}
-
-        result[range_label] = avg_counts
-    return result
-
-def fix_missing_days(buckets, old_buckets, window="three_months", fallback_from=None):
-    """
-    Apply rules:
-      - Missing weekdays → average / old data
-      - Weekdays with <4 slots → pull from fallback (7d→3m, 3m→old, fallback to average if no old data)
-    """
-    weekmap = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
-    existing_days = set(buckets.keys())
-    missing_days = [d for d in weekmap if d not in existing_days]
-
-    print(f"Window: {window}")
-    print(f"Existing days: {existing_days}")
-    print(f"Missing days: {missing_days}")
-    print(f"Old buckets keys: {list(old_buckets.keys())} if old_buckets exists: {bool(old_buckets)}")
-
-    # Missing weekdays
-    if len(missing_days) == 1:
-        buckets[missing_days[0]] = average_missing_day(buckets)
-        print(f"Added missing day {missing_days[0]} using average")
-    elif len(missing_days) >= 2:
-        for md in missing_days:
-            if old_buckets and md in old_buckets:
-                buckets[md] = old_buckets[md]
-                print(f"Added missing day {md} from old_buckets")
-            else:
-                buckets[md] = average_missing_day(buckets)
-                print(f"Added missing day {md} using average")
-
-    # Weak weekdays (<4 slots)
-    for wd in weekmap:
-        if wd not in buckets:
+def windows_due(window_days, freshness, settings, force=False):
+    """
+    The windows (name -> days) due this run, and the names of those that must be
+    recomputed whatever the data did. A window must be when it was never
+    computed or the settings recorded in its fingerprint (SETTINGS_KEYS) changed
+    since; `force` makes every window a must. The others are due once their
+    WINDOW_REFRESH_SECONDS have passed. Decided without touching jobinvite, so a
+    run with nothing due costs no scan.
+    """
+    now = datetime.now()
+    due, required = {}, set()
+    for key, days in window_days.items():
+        entry = freshness.get(key)
+        if (
+            force
+            or entry is None
+            or any(entry["fingerprint"].get(k) != settings.get(k) for k in SETTINGS_KEYS)
+        ):
+            due[key] = days
+            required.add(key)
             continue
-        print(f"Checking {wd} with {len(buckets[wd])} slots")
-        if len(buckets[wd]) < 4:
-            if window == "seven_days" and fallback_from and wd in fallback_from:
-                buckets[wd] = fallback_from[wd]
-                print(f"Replaced {wd} from fallback_from (three_months)")
-            elif window == "three_months" and old_buckets and wd in old_buckets:
-                buckets[wd] = old_buckets[wd]
-                print(f"Replaced {wd} from old_buckets")
-            else:
-                buckets[wd] = average_missing_day(buckets)
-                print(f"Replaced {wd} using average_missing_day due to missing old_buckets data")
-
-    return buckets
+        age = (now - datetime.fromisoformat(entry["computed_at"])).total_seconds()
+        if age >= cron_days_settings.WINDOW_REFRESH_SECONDS.get(key, 0):
+            due[key] = days
+    return due, required
 
-# ---------------- Core Analysis ---------------- #
 
-async def generate_best_times_new():
-    """Perform new analysis with fallbacks and missing/weak-day handling."""
+def windows_to_refresh(window_days, due, required, freshness, fingerprint):
+    """
+    The due windows to recompute: with ANALYSIS_SKIP_UNCHANGED, those not
+    `required` whose source fingerprint is still the one they were computed
+    from are dropped. Every shorter window is added to the rest, since the scan
+    for the longest one covers them for free.
+    """
+    if cron_days_settings.ANALYSIS_SKIP_UNCHANGED:
+        due = {
+            key: days for key, days in due.items()
+            if key in required or freshness[key]["fingerprint"] != fingerprint
+        }
+    if due:
+        longest = max(due.values())
+        due = {key: days for key, days in window_days.items() if key in due or days <= longest}
+    return due
+
+async def generate_best_times_new(force: bool = False):
+    """
+    Perform new analysis with fallbacks and missing/weak-day handling.
+    Only the windows due per windows_due are recomputed; the others are carried
+    over from the live results, and the run is skipped when none is due.
+    """
     run_id = str(uuid.uuid4())
     print(f"Starting generate_best_times_new with run_id: {run_id}")
-
-    # Load old results
-    file_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-        "analysis_results",
-        "best_times.json"
-    )
+    run_started = time.perf_counter()
+    debug = cron_days_settings.ANALYSIS_DEBUG
+    # Phase and (country, phase) -> seconds, published once the run completes
+    phases = {"fetch": 0.0, "bucketing": 0.0, "fallback": 0.0, "write": 0.0}
+    country_phases = {}
+
+    # Load old results (the current version, or the legacy best_times.json)
+    manifest = None
     old_data = {}
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, "r") as f:
-                old_data = json.load(f)
+    try:
+        manifest = read_manifest()
+        file_path = current_results_path(manifest=manifest)
+        old_data = load_results()
+        if debug:
             print(f"Successfully loaded old_data from {file_path}: {json.dumps(old_data, indent=2)}")
-        except json.JSONDecodeError as e:
-            print(f"Failed to load JSON from {file_path}: {e}")
-            old_data = {}
-        except Exception as e:
-            print(f"Error accessing {file_path}: {e}")
-            old_data = {}
+        else:
+            print(f"Successfully loaded old_data from {file_path} ({len(old_data)} countries)")
+    except FileNotFoundError as e:
+        print(e)
+    except ValueError as e:
+        print(f"Failed to load JSON results: {e}")
+        old_data = {}
+    except Exception as e:
+        print(f"Error accessing results: {e}")
+        old_data = {}
+
+    # The scans only read and can run on the replica; rollup mode writes its
+    # rollup table, so it stays on the primary
+    if cron_days_settings.ANALYSIS_MODE == "rollup":
+        session_maker = async_session_maker
     else:
-        print(f"File {file_path} does not exist")
-
-    async with async_session_maker() as session:
+        session_maker = read_session_maker
+    async with session_maker() as session:
         latest_date_result = await session.execute(select(func.max(JobInvite.call_start_time)))
         latest_date = latest_date_result.scalar_one_or_none()
         if not latest_date:
             print("No records in DB. Exiting.")
+            ANALYSIS_RUNS.inc(outcome="empty")
             return
 
-        # Query cutoff = 3 months
-        start_date = latest_date - timedelta(days=cron_days_settings.THREE_MONTHS)
-        stmt = select(JobInvite).where(JobInvite.call_start_time >= start_date)
-
-        country_map = defaultdict(list)
-        try:
-            async for row in (await session.stream(stmt.execution_options(yield_per=1000))).scalars():
-                # Normalize country code to string
-                country_code = str(row.countryCode)
-                country_map[country_code].append(row)
-        except Exception as e:
-            print(f"Error fetching data: {e}")
+        window_days = cron_days_settings.ANALYSIS_WINDOWS
+        sample = None
+        if cron_days_settings.ANALYSIS_MODE == "rows" and cron_days_settings.ANALYSIS_SAMPLE_RATE < 1:
+            sample = (cron_days_settings.ANALYSIS_SAMPLE_RATE, cron_days_settings.ANALYSIS_SAMPLE_MIN_CALLS)
+        # Only the rows mode sees call durations
+        duration_quantiles = (
+            cron_days_settings.ANALYSIS_DURATION_QUANTILES and cron_days_settings.ANALYSIS_MODE == "rows"
+        )
+        settings = settings_fingerprint(
+            window_days, cron_days_settings.ANALYSIS_MODE, sample, duration_quantiles
+        )
+        freshness = window_freshness(manifest, window_days)
+        due_days, required = windows_due(window_days, freshness, settings, force=force)
+        if not due_days:
+            print(f"No window due for a refresh. Skipping run_id: {run_id}")
+            ANALYSIS_RUNS.inc(outcome="skipped")
             return
+        # Summarize only as far back as the longest due window
+        fingerprint = await source_fingerprint(session, latest_date, max(due_days.values()), settings)
+        due_days = windows_to_refresh(window_days, due_days, required, freshness, fingerprint)
+        if not due_days:
+            print(f"Source data unchanged ({fingerprint}). Skipping run_id: {run_id}")
+            ANALYSIS_RUNS.inc(outcome="skipped")
+            return
+        reused = [key for key in window_days if key not in due_days]
+        if reused:
+            print(f"Refreshing windows {list(due_days)}, reusing {reused} from their last run")
 
-        if not country_map:
+        # The scan only reaches back as far as the longest due window
+        fetched = await fetch_country_windows(session, latest_date, due_days, phases, country_phases)
+        if fetched is None:
+            return
+        country_windows, sampled_rows = fetched
+        missing = [c for c in country_windows if any(key not in old_data.get(c, {}) for key in reused)]
+        if missing:
+            print(f"No previous {reused} results for countries {missing}; refreshing every window")
+            due_days, reused = window_days, []
+            fetched = await fetch_country_windows(session, latest_date, due_days, phases, country_phases)
+            if fetched is None:
+                return
+            country_windows, sampled_rows = fetched
+
+        if not country_windows and not reused:
             print("No new data fetched. Exiting.")
+            ANALYSIS_RUNS.inc(outcome="empty")
             return
 
-        print(f"Data fetched for countries: {list(country_map.keys())}")
-
+        print(f"Data fetched for countries: {list(country_windows.keys())}")
+        if reused:
+            # Countries without calls in the refreshed windows keep their reused
+            # windows; the refreshed ones come out empty, as in a full run
+            for country in old_data:
+                if country not in country_windows:
+                    country_windows[country] = DailySlotCounts(
+                        latest_date, sketch_durations=duration_quantiles
+                    ).windows(due_days)
+
+        phase_started = time.perf_counter()
         final_results = {}
+        for country, windows in country_windows.items():
+            country_started = time.perf_counter()
+            country_results = build_country_results(
+                country, windows, old_data, debug=debug, reused=reused
+            )
+            final_results[country] = {key: country_results[key] for key in window_days if key in country_results}
+            country_phases[(country, "fallback")] = time.perf_counter() - country_started
+        phases["fallback"] = time.perf_counter() - phase_started
+        if reused:
+            # Keep the previous country order; countries new to the results go last
+            final_results = {c: final_results[c] for c in dict.fromkeys([*old_data, *final_results])}
+
+        phase_started = time.perf_counter()
+        computed = {
+            "computed_at": datetime.now().isoformat(),
+            "run_id": run_id,
+            "latest_call": str(latest_date),
+            "fingerprint": fingerprint,
+        }
+        file_path = publish_results(
+            final_results,
+            run_id,
+            fingerprint,
+            retain=cron_days_settings.RESULTS_RETAIN_VERSIONS,
+            # Ranked slots per country and window, served by /best_slots without re-sorting
+            artifacts={"slot_index": build_slot_index(final_results)},
+            windows={key: computed if key in due_days else freshness[key] for key in window_days},
+        )
+        phases["write"] = time.perf_counter() - phase_started
+
+        rows = fingerprint["row_count"] if sampled_rows is None else sampled_rows
+        record_run_metrics(phases, country_phases, rows, time.perf_counter() - run_started)
+        ANALYSIS_SCAN_DAYS.set(max(due_days.values()))
+        for key in due_days:
+            ANALYSIS_WINDOW_REFRESHES.inc(window=key)
 
-        for country, rows in country_map.items():
-            final_results[country] = {}
-            windows = {
-                "three_months": latest_date - timedelta(days=cron_days_settings.THREE_MONTHS),
-                "seven_days": latest_date - timedelta(days=cron_days_settings.SEVEN_DAYS),
-            }
-
-            for key, cutoff in windows.items():
-                print(f"Processing window: {key} for country: {country}")
-                window_rows = [r for r in rows if r.call_start_time >= cutoff]
-                buckets = bucketize_calls(window_rows)
-                avgs = calculate_averages(window_rows)
-
-                # old buckets for fallback, normalize country code
-                old_buckets = old_data.get(str(country), {}).get(key, {})
-                print(f"Old buckets for {country}/{key}: {json.dumps(old_buckets, indent=2)}")
-                fallback_from = final_results[country].get("three_months", {}) if key == "seven_days" else None
-
-                # Apply fix rules
-                buckets = fix_missing_days(buckets, old_buckets, window=key, fallback_from=fallback_from)
-
-                # Special case: if 7d completely empty
-                if key == "seven_days" and not buckets:
-                    buckets = old_buckets or final_results[country].get("three_months", {})
-
-                window_obj = dict(buckets)
-                window_obj.update(avgs)
-                final_results[country][key] = window_obj
+        print(f"Results saved to {file_path} for run_id: {run_id}")
 
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "w") as f:
-            json.dump(final_results, f, default=str, indent=4)
 
-        print(f"Results saved to {file_path} for run_id: {run_id}")
+async def run_best_times_job(force: bool = False):
+    """
+    Scheduler entry point. Every API worker/pod schedules the job, but only the
+    elected leader (ANALYSIS_LEADER_ELECTION) computes; the others keep serving
+    whatever it publishes, which their results cache picks up on its own.
+    """
+    async with leadership("best_times") as leader:
+        if not leader:
+            print("Another process leads the analysis job. Skipping this run.")
+            ANALYSIS_RUNS.inc(outcome="not_leader")
+            return
+        await generate_best_times_new(force=force)
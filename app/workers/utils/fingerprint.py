@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from sqlalchemy import select, func
+
+from app.api.routes.v1.analysis.models import JobInvite
+
+
+# Fingerprint keys that record settings rather than data; results computed
+# under other values of any of them are stale whatever the data did
+SETTINGS_KEYS = ("windows", "mode", "sample", "duration_quantiles")
+
+
+def settings_fingerprint(window_days, mode, sample=None, duration_quantiles=False):
+    """
+    The SETTINGS_KEYS part of the fingerprint: the window and mode settings, plus
+    the (rate, min calls) `sample` settings of a sampled run and
+    `duration_quantiles` when the run computes them, so a config change forces
+    a recompute. Needs no query.
+    """
+    fingerprint = {"windows": dict(window_days), "mode": mode}
+    if sample is not None:
+        fingerprint["sample"] = list(sample)
+    if duration_quantiles:
+        fingerprint["duration_quantiles"] = True
+    return fingerprint
+
+
+async def source_fingerprint(session, latest_date, days, settings):
+    """
+    Cheap summary of everything the analysis reads: the latest call plus MAX(nid),
+    COUNT(*) and MAX(UPDATIONDATE) over the last `days` days (the longest window
+    due), together with the `settings` from settings_fingerprint. New, deleted or
+    updated rows in that span change at least one of them. `days` is recorded
+    too, so fingerprints taken over different spans never compare equal.
+    The result is stored in the results manifest by publish_results.
+    """
+    start_date = latest_date - timedelta(days=days)
+    stmt = select(
+        func.max(JobInvite.nid),
+        func.count(),
+        func.max(JobInvite.UPDATIONDATE),
+    ).where(JobInvite.call_start_time >= start_date)
+    max_nid, row_count, max_updated = (await session.execute(stmt)).one()
+    return {
+        "max_call_start_time": str(latest_date),
+        "scanned_days": days,
+        "max_nid": max_nid,
+        "row_count": row_count,
+        "max_updationdate": str(max_updated) if max_updated is not None else None,
+        **settings,
+    }
@@ -0,0 +1,182 @@
+import asyncio
+import os
+import socket
+import uuid
+from contextlib import asynccontextmanager, suppress
+from pathlib import Path
+
+from sqlalchemy import DateTime, case, delete, func, insert, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: no file lock, only the lease elects a leader
+    fcntl = None
+
+from app.api.routes.v1.analysis.models import AnalysisLease
+from app.config import CronSettings
+from app.core.results_store import RESULTS_DIR
+from app.db.session import async_session_maker
+
+cron_settings = CronSettings()
+
+# Stable for the life of the process, so a leader re-acquires its own lease on the next run
+HOLDER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Names this process won a lease for; file locks live in _lock_handles
+_leases_held = set()
+_lock_handles = {}
+
+
+class utc_after(FunctionElement):
+    """UTC_TIMESTAMP() plus `seconds` on the database server's clock."""
+
+    type = DateTime()
+    name = "utc_after"
+    inherit_cache = True
+
+
+@compiles(utc_after)
+def _compile_utc_after(element, compiler, **kw):
+    return f"UTC_TIMESTAMP() + INTERVAL {compiler.process(element.clauses, **kw)} SECOND"
+
+
+def lock_file_path(name: str) -> Path:
+    if cron_settings.ANALYSIS_LOCK_FILE:
+        return Path(cron_settings.ANALYSIS_LOCK_FILE)
+    return RESULTS_DIR / ("analysis.lock" if name == "best_times" else f"analysis-{name}.lock")
+
+
+async def acquire_lease(session_maker, name: str, holder: str, seconds: int) -> bool:
+    """
+    Take or extend the `name` lease for `seconds`. Succeeds when the row is
+    missing, expired or already held by `holder`. Competing UPDATEs on the row
+    are serialized by the database, so only one process can win an expired lease.
+    Times come from the database clock, so skew between hosts can't cut a
+    lease short or extend it.
+    """
+    now = func.utc_timestamp()
+    expires_at = utc_after(seconds)
+    async with session_maker() as session:
+        result = await session.execute(
+            update(AnalysisLease)
+            .where(
+                AnalysisLease.name == name,
+                (AnalysisLease.holder == holder) | (AnalysisLease.expires_at < now),
+            )
+            .values(
+                holder=holder,
+                acquired_at=case((AnalysisLease.holder == holder, AnalysisLease.acquired_at), else_=now),
+                expires_at=expires_at,
+            )
+        )
+        if result.rowcount == 1:
+            await session.commit()
+            return True
+        try:
+            await session.execute(
+                insert(AnalysisLease).values(name=name, holder=holder, acquired_at=now, expires_at=expires_at)
+            )
+            await session.commit()
+            return True
+        except IntegrityError:
+            # Someone else holds it (or inserted it first)
+            await session.rollback()
+            return False
+
+
+async def release_lease(session_maker, name: str, holder: str) -> None:
+    async with session_maker() as session:
+        await session.execute(delete(AnalysisLease).where(AnalysisLease.name == name, AnalysisLease.holder == holder))
+        await session.commit()
+
+
+async def _keep_renewed(session_maker, name: str, holder: str, seconds: int) -> None:
+    while True:
+        await asyncio.sleep(seconds / 3)
+        try:
+            if not await acquire_lease(session_maker, name, holder, seconds):
+                print(f"Lost the {name} lease to another process")
+                return
+        except SQLAlchemyError as e:
+            print(f"Could not renew the {name} lease: {e}")
+
+
+def _try_lock_file(name: str) -> bool:
+    """Hold an exclusive flock on the lock file for the rest of the process, if nobody else does."""
+    if name in _lock_handles:
+        return True
+    if fcntl is None:
+        print(f"No file locking on this platform; running {name} without leader election")
+        return True
+    path = lock_file_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(path, "a+")
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        return False
+    _lock_handles[name] = handle
+    return True
+
+
+@asynccontextmanager
+async def leadership(name: str = "best_times", mode: str = None, session_maker=None, lease_seconds: int = None):
+    """
+    Yield True when this process is the leader for `name`, False otherwise.
+
+    Leadership is sticky: the lease is renewed while the block runs and left
+    held for a full ANALYSIS_LEASE_SECONDS afterwards, so the same process
+    keeps winning as long as it runs at least that often, and another one only
+    takes over after it stopped (or resign_leadership was called). The file
+    lock is held until the process exits.
+    """
+    mode = mode or cron_settings.ANALYSIS_LEADER_ELECTION
+    session_maker = session_maker or async_session_maker
+    lease_seconds = lease_seconds or cron_settings.ANALYSIS_LEASE_SECONDS
+
+    if mode == "none":
+        yield True
+        return
+
+    if mode == "lease":
+        try:
+            leader = await acquire_lease(session_maker, name, HOLDER, lease_seconds)
+        except SQLAlchemyError as e:
+            print(f"Lease for {name} unavailable, falling back to the file lock: {e}")
+        else:
+            if not leader:
+                _leases_held.discard(name)
+                yield False
+                return
+            _leases_held.add(name)
+            heartbeat = asyncio.create_task(_keep_renewed(session_maker, name, HOLDER, lease_seconds))
+            try:
+                yield True
+            finally:
+                heartbeat.cancel()
+                with suppress(asyncio.CancelledError):
+                    await heartbeat
+                try:
+                    await acquire_lease(session_maker, name, HOLDER, lease_seconds)
+                except SQLAlchemyError as e:
+                    print(f"Could not renew the {name} lease: {e}")
+            return
+
+    yield _try_lock_file(name)
+
+
+async def resign_leadership(name: str = "best_times", session_maker=None) -> None:
+    """Give up the lease and file lock so another process can take over right away, e.g. on shutdown."""
+    handle = _lock_handles.pop(name, None)
+    if handle is not None:
+        handle.close()
+    if name in _leases_held:
+        _leases_held.discard(name)
+        try:
+            await release_lease(session_maker or async_session_maker, name, HOLDER)
+        except SQLAlchemyError as e:
+            print(f"Could not release the {name} lease: {e}")
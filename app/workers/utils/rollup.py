@@ -0,0 +1,176 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.mysql import insert
+
+from app.api.routes.v1.analysis.models import JobInvite, CallRollup, AnalysisWatermark
+from app.config import CronSettings
+from app.workers.utils.analysis import get_time_ranges, classify_call, count_questions_from_dtmf
+from app.workers.utils.sql_aggregate import OUTCOMES, WEEKMAP, WindowAggregate
+
+cron_settings = CronSettings()
+
+WATERMARK_NAME = "jobinvite_hourly_rollup"
+OUTCOME_INDEX = {label: i for i, label in enumerate(OUTCOMES)}
+UPSERT_BATCH_SIZE = 1000
+
+
+async def _fold_rows(session, *conditions):
+    """
+    Stream matching jobinvite rows and total them per (country, date, hour, outcome).
+    Values are [calls, duration_sum, duration_n, dtmf_sum, dtmf_n].
+    """
+    stmt = select(
+        JobInvite.countryCode,
+        JobInvite.call_start_time,
+        JobInvite.total_call,
+        JobInvite.DTMF,
+    ).where(*conditions)
+
+    totals = {}
+    result = await session.stream(stmt.execution_options(yield_per=1000))
+    async for country_code, call_start_time, total_call, dtmf in result.tuples():
+        key = (
+            str(country_code),
+            call_start_time.date(),
+            call_start_time.hour,
+            OUTCOME_INDEX[classify_call(total_call)],
+        )
+        acc = totals.get(key)
+        if acc is None:
+            acc = totals[key] = [0, 0, 0, 0, 0]
+        acc[0] += 1
+        if total_call and total_call > 0:
+            acc[1] += total_call
+            acc[2] += 1
+        if dtmf:
+            acc[3] += count_questions_from_dtmf(dtmf)
+            acc[4] += 1
+    return totals
+
+
+async def _upsert_totals(session, totals):
+    """Add totals onto existing rollup rows, inserting the ones that don't exist yet."""
+    if not totals:
+        return
+    values = [
+        {
+            "countryCode": country,
+            "call_date": call_date,
+            "call_hour": hour,
+            "outcome": outcome,
+            "calls": acc[0],
+            "duration_sum": acc[1],
+            "duration_n": acc[2],
+            "dtmf_sum": acc[3],
+            "dtmf_n": acc[4],
+        }
+        for (country, call_date, hour, outcome), acc in totals.items()
+    ]
+    table = CallRollup.__table__
+    stmt = insert(table)
+    stmt = stmt.on_duplicate_key_update(
+        calls=table.c.calls + stmt.inserted.calls,
+        duration_sum=table.c.duration_sum + stmt.inserted.duration_sum,
+        duration_n=table.c.duration_n + stmt.inserted.duration_n,
+        dtmf_sum=table.c.dtmf_sum + stmt.inserted.dtmf_sum,
+        dtmf_n=table.c.dtmf_n + stmt.inserted.dtmf_n,
+    )
+    for i in range(0, len(values), UPSERT_BATCH_SIZE):
+        await session.execute(stmt, values[i:i + UPSERT_BATCH_SIZE])
+
+
+async def refresh_rollup(session, latest_date):
+    """
+    Bring jobinvite_hourly_rollup up to date and advance the watermark.
+
+      - Whole days from (watermark - ROLLUP_RESCAN_DAYS) onward are deleted and
+        rebuilt, so rows updated or back-filled within that window are picked up.
+      - Rows inserted since the last run (nid above the watermark) whose
+        call_start_time falls before the re-scan window are folded in additively.
+      - Rollup rows older than the longest window are pruned.
+    Without a watermark the whole three-month horizon is built once.
+    """
+    # One extra day so hour-aligned windows never lose a straddling bucket
+    horizon = latest_date - timedelta(days=max(cron_settings.ANALYSIS_WINDOWS.values()) + 1)
+    max_nid = (await session.execute(select(func.max(JobInvite.nid)))).scalar_one_or_none()
+
+    watermark = await session.get(AnalysisWatermark, WATERMARK_NAME)
+    if watermark is None or watermark.last_call_start_time is None:
+        rescan_from = horizon
+    else:
+        rescan_from = max(
+            watermark.last_call_start_time - timedelta(days=cron_settings.ROLLUP_RESCAN_DAYS),
+            horizon,
+        )
+    rescan_from = datetime.combine(rescan_from.date(), time.min)
+    print(f"Refreshing rollup from {rescan_from} (watermark: {watermark.last_nid if watermark else None} -> {max_nid})")
+
+    await session.execute(delete(CallRollup).where(CallRollup.call_date >= rescan_from.date()))
+    await _upsert_totals(session, await _fold_rows(
+        session,
+        JobInvite.call_start_time >= rescan_from,
+        JobInvite.nid <= max_nid,
+    ))
+
+    if watermark is not None and watermark.last_nid is not None:
+        await _upsert_totals(session, await _fold_rows(
+            session,
+            JobInvite.nid > watermark.last_nid,
+            JobInvite.nid <= max_nid,
+            JobInvite.call_start_time >= horizon,
+            JobInvite.call_start_time < rescan_from,
+        ))
+
+    await session.execute(delete(CallRollup).where(CallRollup.call_date < horizon.date()))
+
+    if watermark is None:
+        watermark = AnalysisWatermark(name=WATERMARK_NAME)
+        session.add(watermark)
+    watermark.last_call_start_time = latest_date
+    watermark.last_nid = max_nid
+    watermark.updated_at = datetime.now()
+    await session.commit()
+
+
+async def load_rollup_windows(session, latest_date, window_days):
+    """
+    Rebuild every window from rollup rows (at most 91 days x 24 hours per country/outcome).
+    Windows are aligned to whole hours: an hourly bucket counts if any part of it
+    is after the cutoff. Returns the same shape as fetch_aggregated_windows.
+    """
+    ranges = get_time_ranges()
+    one_hour = timedelta(hours=1)
+    cutoffs = {key: latest_date - timedelta(days=days) for key, days in window_days.items()}
+    start_date = min(cutoffs.values())
+    stmt = select(CallRollup).where(CallRollup.call_date >= start_date.date())
+    rows = (await session.execute(stmt)).scalars().all()
+    rows = sorted(rows, key=lambda r: (r.countryCode, r.call_date.weekday(), r.call_hour, r.outcome))
+
+    aggregates = {}
+    for row in rows:
+        bucket_end = datetime.combine(row.call_date, time(row.call_hour)) + one_hour
+        if bucket_end <= start_date:
+            continue
+        windows = aggregates.get(row.countryCode)
+        if windows is None:
+            windows = aggregates[row.countryCode] = {key: WindowAggregate() for key in window_days}
+        for key, cutoff in cutoffs.items():
+            if bucket_end <= cutoff:
+                continue
+            agg = windows[key]
+            agg.add_slot(
+                WEEKMAP[row.call_date.weekday()],
+                ranges[row.call_hour][1],
+                OUTCOMES[row.outcome],
+                row.calls,
+                row.duration_sum,
+                row.duration_n,
+            )
+            agg.dtmf_sum += row.dtmf_sum
+            agg.dtmf_n += row.dtmf_n
+
+    return {
+        country: {key: agg.result() for key, agg in windows.items()}
+        for country, windows in aggregates.items()
+    }
@@ -0,0 +1,64 @@
+import math
+from statistics import NormalDist
+
+from app.api.routes.v1.analysis.models import JobInvite
+from app.workers.utils.analysis import get_time_ranges
+from app.workers.utils.sql_aggregate import WEEKMAP
+
+# Knuth's multiplicative hash: nid * 2654435761 mod 2**32 is a golden-ratio
+# sequence over consecutive nids, so any run of them (calls are inserted in
+# time order, so roughly any day and hour) keeps very close to `rate` of its
+# calls, and the same nids are picked on every run. nid is an INT, so the
+# product stays within MySQL's BIGINT.
+HASH_MULTIPLIER = 2654435761
+HASH_SPACE = 2 ** 32
+
+CONFIDENCE = 0.95
+Z = NormalDist().inv_cdf((1 + CONFIDENCE) / 2)
+# Sampled calls a slot needs for its interval to mean anything; with fewer, the
+# normal approximation breaks down and the width runs up to ~100 points
+MIN_SLOT_SAMPLE = 30
+
+
+def in_sample(rate):
+    """WHERE clause keeping the deterministic `rate` fraction of JobInvite rows."""
+    return (JobInvite.nid * HASH_MULTIPLIER) % HASH_SPACE < int(rate * HASH_SPACE)
+
+
+def wilson_width(k, n, z=Z):
+    """Width of the Wilson score interval for `k` of `n` sampled calls, in percentage points."""
+    return 200 * z * math.sqrt(k * (n - k) / n + z * z / 4) / (n + z * z)
+
+
+def sample_fields(slot_counts, rate):
+    """
+    The CompleteAnalysis precision fields for a window counted from a sample,
+    from {(weekday, hour): [not_answered, not_interested, interested, ...]}.
+    Each slot's percentages are estimated from that slot's sampled calls alone
+    (the weekday/hour is the stratum); its width is the widest CONFIDENCE
+    interval of its three percentages, or None (insufficient) below
+    MIN_SLOT_SAMPLE calls. The window's width is the mean of the sufficient
+    slots' widths weighted by their calls, so a few sparse slots cannot set it.
+    """
+    ranges = get_time_ranges()
+    size = 0
+    weighted = weight = 0
+    widths = {}
+    for (weekday, hour), counts in sorted(slot_counts.items()):
+        n = sum(counts[:3])
+        if not n:
+            continue
+        size += n
+        width = None
+        if n >= MIN_SLOT_SAMPLE:
+            width = max(wilson_width(k, n) for k in counts[:3])
+            weighted += n * width
+            weight += n
+            width = round(width, 2)
+        widths.setdefault(WEEKMAP[weekday], {})[ranges[hour][1]] = width
+    return {
+        "sample_rate": rate,
+        "sample_size": size,
+        "interval_width": round(weighted / weight, 2) if weight else None,
+        "slot_interval_widths": widths or None,
+    }
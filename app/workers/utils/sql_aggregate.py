@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+from sqlalchemy import select, func, case, literal
+
+from app.api.routes.v1.analysis.models import JobInvite
+from app.workers.utils.analysis import (
+    get_time_ranges,
+    counts_to_percentages,
+    count_questions_from_dtmf,
+    averages_from_sums,
+)
+
+# Order matches classify_call and the outcome keys written by bucketize_calls
+OUTCOMES = ["not_answered", "not_interested", "interested"]
+WEEKMAP = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+class WindowAggregate:
+    """Pre-grouped counts and sums for one country/window."""
+
+    __slots__ = ("counts", "duration_sum", "duration_n", "dtmf_sum", "dtmf_n")
+
+    def __init__(self):
+        self.counts = {}
+        self.duration_sum = 0
+        self.duration_n = 0
+        self.dtmf_sum = 0
+        self.dtmf_n = 0
+
+    def add_slot(self, weekday, range_label, outcome, calls, duration_sum, duration_n):
+        slot = self.counts.setdefault(weekday, {}).setdefault(
+            range_label, {"not_answered": 0, "not_interested": 0, "interested": 0}
+        )
+        slot[outcome] += calls
+        self.duration_sum += duration_sum
+        self.duration_n += duration_n
+
+    def result(self):
+        """Return (buckets, avgs) exactly as bucketize_calls/calculate_averages would."""
+        buckets = counts_to_percentages(self.counts)
+        avgs = averages_from_sums(self.duration_sum, self.duration_n, self.dtmf_sum, self.dtmf_n)
+        return buckets, avgs
+
+
+def _outcome_expr():
+    # Mirrors classify_call: 0/NULL -> not_answered, <120 -> not_interested, else interested
+    return case(
+        (JobInvite.total_call.is_(None), 0),
+        (JobInvite.total_call == 0, 0),
+        (JobInvite.total_call < 120, 1),
+        else_=2,
+    )
+
+
+async def fetch_aggregated_windows(session, latest_date, window_days):
+    """
+    Let MySQL do the weekday/hour/outcome bucketing for every window in one scan.
+
+    Each row gets a band: the index of the shortest window containing it, with
+    windows sorted by length. Groups are keyed by (countryCode, band, WEEKDAY,
+    HOUR, outcome) and a window is the sum of its band and all shorter ones.
+    Groups carry MIN(nid), so dicts are filled in the same first-seen order the
+    row-streaming path produces (it walks the clustered index in nid order).
+    Returns {country: {window: (buckets, avgs)}} with windows in `window_days` order.
+    """
+    ranges = get_time_ranges()
+    by_days = sorted(window_days.items(), key=lambda kv: kv[1])
+    start_date = latest_date - timedelta(days=by_days[-1][1])
+    whens = [
+        (JobInvite.call_start_time >= latest_date - timedelta(days=days), i)
+        for i, (_, days) in enumerate(by_days[:-1])
+    ]
+    band = case(*whens, else_=len(by_days) - 1) if whens else literal(len(by_days) - 1)
+    # Windows that contain a row of each band
+    band_windows = [[key for key, _ in by_days[i:]] for i in range(len(by_days))]
+
+    weekday = func.weekday(JobInvite.call_start_time)
+    hour = func.hour(JobInvite.call_start_time)
+    outcome = _outcome_expr()
+    positive = JobInvite.total_call > 0
+
+    slot_stmt = (
+        select(
+            JobInvite.countryCode,
+            band.label("band"),
+            weekday.label("weekday"),
+            hour.label("hour"),
+            outcome.label("outcome"),
+            func.count().label("calls"),
+            func.sum(case((positive, JobInvite.total_call), else_=0)).label("duration_sum"),
+            func.sum(case((positive, 1), else_=0)).label("duration_n"),
+            func.min(JobInvite.nid).label("first_nid"),
+        )
+        .where(JobInvite.call_start_time >= start_date)
+        .group_by(JobInvite.countryCode, band, weekday, hour, outcome)
+        .order_by("first_nid")
+    )
+
+    # DTMF question counts need Python's split/strip semantics, so group by the
+    # raw value (few distinct VARCHAR(8) strings) and count in Python.
+    non_empty = func.char_length(JobInvite.DTMF) > 0
+    dtmf_stmt = (
+        select(
+            JobInvite.countryCode,
+            band.label("band"),
+            JobInvite.DTMF,
+            non_empty.label("non_empty"),
+            func.count().label("calls"),
+        )
+        .where(JobInvite.call_start_time >= start_date, JobInvite.DTMF.is_not(None))
+        .group_by(JobInvite.countryCode, band, JobInvite.DTMF, non_empty)
+    )
+
+    aggregates = {}
+    for row in (await session.execute(slot_stmt)).all():
+        country = str(row.countryCode)
+        windows = aggregates.get(country)
+        if windows is None:
+            windows = aggregates[country] = {key: WindowAggregate() for key in window_days}
+        for key in band_windows[row.band]:
+            windows[key].add_slot(
+                WEEKMAP[row.weekday],
+                ranges[row.hour][1],
+                OUTCOMES[row.outcome],
+                int(row.calls),
+                int(row.duration_sum or 0),
+                int(row.duration_n or 0),
+            )
+
+    for row in (await session.execute(dtmf_stmt)).all():
+        windows = aggregates.get(str(row.countryCode))
+        if windows is None or not row.non_empty:
+            continue
+        questions = count_questions_from_dtmf(row.DTMF) * int(row.calls)
+        for key in band_windows[row.band]:
+            windows[key].dtmf_sum += questions
+            windows[key].dtmf_n += int(row.calls)
+
+    return {
+        country: {key: agg.result() for key, agg in windows.items()}
+        for country, windows in aggregates.items()
+    }
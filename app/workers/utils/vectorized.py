@@ -0,0 +1,212 @@
+from array import array
+
+import numpy as np
+
+from app.workers.utils.analysis import (
+    get_time_ranges,
+    count_questions_from_dtmf,
+    averages_from_sums,
+)
+from app.workers.utils.sampling import sample_fields
+from app.workers.utils.sketch import DurationSketch, bucket_key, duration_quantile_fields
+from app.workers.utils.sql_aggregate import OUTCOMES, WEEKMAP
+
+SLOTS = 7 * 24
+SECONDS_PER_DAY = 86400
+
+
+class CallColumns:
+    """
+    Per-country int64 buffers filled while streaming; NumPy views them without copying.
+    DTMF strings are dictionary-encoded so each distinct value is counted once.
+    """
+
+    __slots__ = ("slot", "age", "total", "dtmf_code", "dtmf_codes")
+
+    def __init__(self):
+        self.slot = array("q")
+        self.age = array("q")
+        self.total = array("q")
+        self.dtmf_code = array("q")
+        self.dtmf_codes = {}
+
+    def append(self, slot, age, total, dtmf):
+        self.slot.append(slot)
+        self.age.append(age)
+        self.total.append(total)
+        code = self.dtmf_codes.get(dtmf)
+        if code is None:
+            code = self.dtmf_codes[dtmf] = len(self.dtmf_codes)
+        self.dtmf_code.append(code)
+
+
+class CallArrays:
+    """
+    Column arrays for one country's calls, in stream order.
+    `slot` is weekday * 24 + hour and `age` is seconds before the latest call.
+    """
+
+    __slots__ = ("slot", "age", "outcome", "total", "questions", "has_dtmf")
+
+    def __init__(self, slot, age, outcome, total, questions, has_dtmf):
+        self.slot = slot
+        self.age = age
+        self.outcome = outcome
+        self.total = total
+        self.questions = questions
+        self.has_dtmf = has_dtmf
+
+    @classmethod
+    def from_columns(cls, columns):
+        total = np.frombuffer(columns.total, dtype=np.int64)
+        # Mirrors classify_call
+        outcome = np.where(total == 0, 0, np.where(total < 120, 1, 2))
+
+        # Vectorized count_questions_from_dtmf: one evaluation per distinct DTMF value
+        dtmf_code = np.frombuffer(columns.dtmf_code, dtype=np.int64)
+        per_value = np.array([count_questions_from_dtmf(d) for d in columns.dtmf_codes], dtype=np.int64)
+        non_empty = np.array([bool(d) for d in columns.dtmf_codes], dtype=bool)
+
+        return cls(
+            np.frombuffer(columns.slot, dtype=np.int64),
+            np.frombuffer(columns.age, dtype=np.int64),
+            outcome,
+            total,
+            per_value[dtmf_code],
+            non_empty[dtmf_code],
+        )
+
+    @classmethod
+    def from_records(cls, rows, latest_date):
+        """Build from CallRecord tuples; slower, as every datetime is unpacked in Python."""
+        columns = CallColumns()
+        for r in rows:
+            started = r.call_start_time
+            age = latest_date - started
+            # Round partial seconds up so `age <= days` matches `call_start_time >= cutoff`
+            seconds = age.days * SECONDS_PER_DAY + age.seconds + (age.microseconds > 0)
+            columns.append(started.weekday() * 24 + started.hour, seconds, r.total_call, r.DTMF)
+        return cls.from_columns(columns)
+
+
+def tensor_to_buckets(counts, first_seen):
+    """
+    Render a count tensor as bucketize_calls output. Weekdays and slots follow
+    first-seen order so the dict (and JSON) matches the pure-Python engine.
+    """
+    ranges = get_time_ranges()
+    totals = counts.sum(axis=2)
+    percentages = counts / np.where(totals == 0, 1, totals)[:, :, None] * 100
+
+    present = totals > 0
+    day_first_seen = np.where(present, first_seen, np.iinfo(np.int64).max).min(axis=1)
+    data = {}
+    for wd in sorted(np.flatnonzero(present.any(axis=1)), key=lambda d: day_first_seen[d]):
+        hours = sorted(np.flatnonzero(present[wd]), key=lambda h: first_seen[wd, h])
+        data[WEEKMAP[wd]] = {
+            ranges[h][1]: {
+                # Python's round on a Python float, to match the pure-Python engine exactly
+                label: round(float(percentages[wd, h, k]), 2)
+                for k, label in enumerate(OUTCOMES)
+            }
+            for h in hours
+        }
+    return data
+
+
+def day_offsets(arrays, max_days):
+    """Each row's age in whole days, rounded up and capped at `max_days`."""
+    return np.minimum(-(-arrays.age // SECONDS_PER_DAY), max_days)
+
+
+def daily_tensor(arrays, max_days):
+    """
+    Bucket rows once by day offset (age in whole days, rounded up). Returns
+    per-offset counts (D x 7 x 24 x 3), first-seen indices (D x 7 x 24) and
+    [duration_sum, duration_n, dtmf_sum, dtmf_n] sums (D x 4), D = max_days + 1.
+    """
+    n = arrays.slot.size
+    days = max_days + 1
+    offset = day_offsets(arrays, max_days)
+    day_slot = offset * SLOTS + arrays.slot
+
+    counts = np.bincount(day_slot * 3 + arrays.outcome, minlength=days * SLOTS * 3).reshape(days, 7, 24, 3)
+    first_seen = np.full(days * SLOTS, n, dtype=np.int64)
+    np.minimum.at(first_seen, day_slot, np.arange(n, dtype=np.int64))
+
+    positive = arrays.total > 0
+    # Weighted bincount sums in float64, which is exact for integer totals below 2**53
+    sums = np.stack([
+        np.bincount(offset, weights=np.where(positive, arrays.total, 0), minlength=days),
+        np.bincount(offset, weights=positive, minlength=days),
+        np.bincount(offset, weights=np.where(arrays.has_dtmf, arrays.questions, 0), minlength=days),
+        np.bincount(offset, weights=arrays.has_dtmf, minlength=days),
+    ], axis=1).astype(np.int64)
+    return counts, first_seen.reshape(days, 7, 24), sums
+
+
+class DurationKeys:
+    """
+    Sketch bucket of every answered call, as an index into the distinct buckets
+    present. bucket_key runs once per distinct duration, in Python, so the
+    buckets (and quantiles) are exactly those of the pure-Python engine.
+    """
+
+    __slots__ = ("positive", "keys", "slot_key")
+
+    def __init__(self, arrays):
+        self.positive = arrays.total > 0
+        durations, inverse = np.unique(arrays.total[self.positive], return_inverse=True)
+        per_duration = np.array([bucket_key(int(d)) for d in durations], dtype=np.int64)
+        self.keys, key_index = np.unique(per_duration[inverse], return_inverse=True)
+        self.slot_key = arrays.slot[self.positive] * self.keys.size + key_index
+
+    def sketches(self, in_window):
+        """{(weekday, hour): DurationSketch} of the answered calls selected by the `in_window` row mask."""
+        n_keys = self.keys.size
+        counts = np.bincount(
+            self.slot_key[in_window[self.positive]], minlength=SLOTS * n_keys
+        ).reshape(SLOTS, n_keys)
+        sketches = {}
+        for slot in np.flatnonzero(counts.any(axis=1)):
+            sketch = sketches[divmod(int(slot), 24)] = DurationSketch()
+            for k in np.flatnonzero(counts[slot]):
+                sketch.bins[int(self.keys[k])] = int(counts[slot, k])
+            sketch.count = int(counts[slot].sum())
+        return sketches
+
+
+def analyze_windows_np(arrays, window_days, sketch_durations=False, sample_rate=None):
+    """
+    Return {window: (buckets, avgs)} for a country's CallArrays and {window: days}.
+    Rows are bucketed by day once; every window is a prefix sum over days.
+    With `sketch_durations`, avgs also carry the duration quantile fields, and
+    the precision fields when the rows are a `sample_rate` sample.
+    """
+    max_days = max(window_days.values())
+    counts, first_seen, sums = daily_tensor(arrays, max_days)
+    counts = counts.cumsum(axis=0)
+    first_seen = np.minimum.accumulate(first_seen, axis=0)
+    sums = sums.cumsum(axis=0)
+
+    if sketch_durations:
+        offset = day_offsets(arrays, max_days)
+        duration_keys = DurationKeys(arrays)
+
+    results = {}
+    for key, days in window_days.items():
+        buckets = tensor_to_buckets(counts[days], first_seen[days])
+        avgs = averages_from_sums(*(int(v) for v in sums[days]))
+        if sketch_durations:
+            avgs.update(duration_quantile_fields(duration_keys.sketches(offset <= days)))
+        if sample_rate is not None:
+            window_counts = counts[days]
+            avgs.update(sample_fields(
+                {
+                    (int(wd), int(h)): window_counts[wd, h].tolist()
+                    for wd, h in zip(*np.nonzero(window_counts.sum(axis=2)))
+                },
+                sample_rate,
+            ))
+        results[key] = (buckets, avgs)
+    return results
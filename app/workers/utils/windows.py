@@ -0,0 +1,133 @@
+from app.workers.utils.analysis import (
+    get_time_ranges,
+    classify_call,
+    counts_to_percentages,
+    count_questions_from_dtmf,
+    averages_from_sums,
+)
+from app.workers.utils.sampling import sample_fields
+from app.workers.utils.sketch import DurationSketch, duration_quantile_fields
+from app.workers.utils.sql_aggregate import OUTCOMES, WEEKMAP
+
+OUTCOME_INDEX = {label: i for i, label in enumerate(OUTCOMES)}
+
+
+def day_offset(age):
+    """Whole days before the latest call, rounded up: offset <= N exactly when the call is inside an N-day window."""
+    return age.days + (1 if age.seconds or age.microseconds else 0)
+
+
+class DayTotals:
+    """Slot counts, average inputs and duration sketches for the calls of one day offset."""
+
+    __slots__ = ("slots", "sketches", "duration_sum", "duration_n", "dtmf_sum", "dtmf_n")
+
+    def __init__(self):
+        # (weekday, hour) -> [not_answered, not_interested, interested, first_seen]
+        self.slots = {}
+        # (weekday, hour) -> DurationSketch of the answered calls
+        self.sketches = {}
+        self.duration_sum = 0
+        self.duration_n = 0
+        self.dtmf_sum = 0
+        self.dtmf_n = 0
+
+
+class DailySlotCounts:
+    """
+    One pass over a country's calls, bucketed by day offset from the latest call.
+    Any N-day window is the running total over offsets 0..N, so each extra
+    window costs O(days x slots) instead of another pass over the rows.
+    With `sketch_durations`, answered call durations also go into per-day,
+    per-slot DurationSketches, merged the same way into each window's quantiles.
+    """
+
+    __slots__ = ("latest_date", "days", "seen", "sketch_durations")
+
+    def __init__(self, latest_date, sketch_durations=False):
+        self.latest_date = latest_date
+        self.days = {}
+        self.seen = 0
+        self.sketch_durations = sketch_durations
+
+    def add(self, call_start_time, total_call, dtmf):
+        offset = day_offset(self.latest_date - call_start_time)
+        day = self.days.get(offset)
+        if day is None:
+            day = self.days[offset] = DayTotals()
+
+        key = (call_start_time.weekday(), call_start_time.hour)
+        slot = day.slots.get(key)
+        if slot is None:
+            slot = day.slots[key] = [0, 0, 0, self.seen]
+        slot[OUTCOME_INDEX[classify_call(total_call)]] += 1
+        self.seen += 1
+
+        if total_call and total_call > 0:
+            day.duration_sum += total_call
+            day.duration_n += 1
+            if self.sketch_durations:
+                sketch = day.sketches.get(key)
+                if sketch is None:
+                    sketch = day.sketches[key] = DurationSketch()
+                sketch.add(total_call)
+        if dtmf:
+            day.dtmf_sum += count_questions_from_dtmf(dtmf)
+            day.dtmf_n += 1
+
+    def windows(self, window_days, sample_rate=None):
+        """
+        Return {window: (buckets, avgs)} for {window: days}, in the order given.
+        When the calls are a `sample_rate` sample, avgs also carry the precision fields.
+        """
+        offsets = sorted(self.days)
+        running = {}
+        running_sketches = {}
+        sums = [0, 0, 0, 0]
+        results = {}
+        i = 0
+        for key, days in sorted(window_days.items(), key=lambda kv: kv[1]):
+            while i < len(offsets) and offsets[i] <= days:
+                day = self.days[offsets[i]]
+                for slot_key, counts in day.slots.items():
+                    total = running.get(slot_key)
+                    if total is None:
+                        running[slot_key] = list(counts)
+                    else:
+                        total[0] += counts[0]
+                        total[1] += counts[1]
+                        total[2] += counts[2]
+                        total[3] = min(total[3], counts[3])
+                for slot_key, sketch in day.sketches.items():
+                    total = running_sketches.get(slot_key)
+                    if total is None:
+                        total = running_sketches[slot_key] = DurationSketch()
+                    total.merge(sketch)
+                sums[0] += day.duration_sum
+                sums[1] += day.duration_n
+                sums[2] += day.dtmf_sum
+                sums[3] += day.dtmf_n
+                i += 1
+            avgs = averages_from_sums(*sums)
+            if self.sketch_durations:
+                avgs.update(duration_quantile_fields(running_sketches))
+            if sample_rate is not None:
+                avgs.update(sample_fields(running, sample_rate))
+            results[key] = (render_slots(running), avgs)
+        return {key: results[key] for key in window_days}
+
+
+def render_slots(slots):
+    """
+    Turn {(weekday, hour): [na, ni, i, first_seen]} into bucketize_calls output,
+    keeping first-seen order so the result matches a single pass over the rows.
+    """
+    ranges = get_time_ranges()
+    counts = {}
+    for (weekday, hour), c in sorted(slots.items(), key=lambda kv: kv[1][3]):
+        counts.setdefault(WEEKMAP[weekday], {})[ranges[hour][1]] = {
+            "not_answered": c[0],
+            "not_interested": c[1],
+            "interested": c[2],
+        }
+    return counts_to_percentages(counts)
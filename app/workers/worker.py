@@ -5,15 +5,16 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler # type: ignore
 from apscheduler.triggers.cron import CronTrigger # type: ignore
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.workers.utils.find_and_analyze_cron import generate_best_times_new
+from app.workers.utils.find_and_analyze_cron import run_best_times_job
+from app.workers.utils.leader import resign_leadership
+from app.db.session import warm_up_pools, dispose_engines
 
 scheduler = AsyncIOScheduler()
 cron_settings = CronSettings()
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+def schedule_analysis(scheduler: AsyncIOScheduler) -> None:
     scheduler.add_job(
-        generate_best_times_new,  # pass the coroutine directly
+        run_best_times_job,  # pass the coroutine directly; runs only in the elected leader
         CronTrigger(
             # day_of_week=cron_settings.CRON_DAY_OF_WEEK,
             # hour=cron_settings.CRON_HOUR,
@@ -24,8 +25,23 @@ async def lifespan(app: FastAPI):
         coalesce=True,
         max_instances=1,
     )
+
+
+async def stop_worker() -> None:
+    """Hand the analysis lease to another process and close the DB pools."""
+    await resign_leadership("best_times")
+    await dispose_engines()
+    print("DB pools disposed ❌")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """API + scheduler in one process (API_RUN_SCHEDULER=true)."""
+    await warm_up_pools()
+    schedule_analysis(scheduler)
     scheduler.start()
     print("Scheduler started ✅")
     yield
     scheduler.shutdown()
     print("Scheduler stopped ❌")
+    await stop_worker()
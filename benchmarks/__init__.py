@@ -0,0 +1,16 @@
+# benchmarks/__init__.py
+"""
+Offline benchmarks for the analysis cron. Run from the repo root, e.g.
+`python -m benchmarks.bench_row_memory --rows 1000000`.
+"""
+import os
+
+# app.config builds DatabaseSettings at import time; benchmarks never touch MySQL.
+for _key, _value in {
+    "MYSQL_SERVER": "localhost",
+    "MYSQL_PORT": "3306",
+    "MYSQL_USER": "bench",
+    "MYSQL_PASSWORD": "bench",
+    "MYSQL_DB": "bench",
+}.items():
+    os.environ.setdefault(_key, _value)
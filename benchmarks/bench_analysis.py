@@ -0,0 +1,221 @@
+# benchmarks/bench_analysis.py
+"""
+Time, throughput and peak memory of the analysis functions on realistic_calls
+data (skewed countries, diurnal hours, quiet weekdays, DTMF answers):
+bucketize_calls and calculate_averages over every row, average_missing_day
+and fix_missing_days over every country's buckets, and the cron's per-country
+pipeline (analyze_country with the Python engine, then build_country_results).
+
+Each function is timed over at least --runs calls and MIN_SECONDS, every
+call paired with a run of a fixed calibration loop in the same process, and
+then run once more under tracemalloc for its peak allocation on top of the
+input. The median of call time / calibration time is compared with the
+stored baseline, so a machine that is uniformly slower or busier cancels
+out; a function more than --tolerance times slower or hungrier than its
+baseline is a regression and makes the exit status 1. Refresh the baseline
+(--save-baseline, which merges per size) with more --runs than a comparison
+uses. No database is involved. 10m needs about 2.5 GiB of RAM.
+
+    python -m benchmarks.bench_analysis --sizes 10k,1m,10m
+    python -m benchmarks.bench_analysis --sizes 10k,1m,10m --runs 9 --save-baseline
+"""
+import argparse
+import contextlib
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+from app.config import CronSettings
+from app.workers.utils.analysis import (
+    CallRecord,
+    average_missing_day,
+    bucketize_calls,
+    calculate_averages,
+    fix_missing_days,
+)
+from app.workers.utils.find_and_analyze_cron import analyze_country, build_country_results
+from benchmarks.synthetic import LATEST_CALL, realistic_calls
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+BASELINE = Path(__file__).parent / "baselines" / "bench_analysis.json"
+RUNS = 5
+MIN_SECONDS = 0.2
+# Allowed growth of the calibrated time (and of peak memory) over the baseline
+TOLERANCE = 1.3
+# Iterations of calibrate(), a few tens of milliseconds of dict and tuple work
+CALIBRATION_LOOPS = 100_000
+# Peaks below this are allocator noise, not a memory regression
+MEMORY_FLOOR = 2**20
+
+cron_settings = CronSettings()
+
+
+def load_calls(n_rows):
+    """Every call as a CallRecord, plus the same records grouped by country as the cron fetches them."""
+    records = []
+    by_country = defaultdict(list)
+    for country_code, started, total_call, dtmf in realistic_calls(n_rows):
+        record = CallRecord(started, total_call, dtmf)
+        records.append(record)
+        by_country[str(country_code)].append(record)
+    return records, dict(by_country)
+
+
+def cases(records, by_country):
+    """(name, units, n_units, fn) for every benchmarked function; inputs are prepared here, not timed."""
+    window_days = cron_settings.ANALYSIS_WINDOWS
+    sketch_durations = cron_settings.ANALYSIS_DURATION_QUANTILES
+    three_months = {country: bucketize_calls(rows) for country, rows in by_country.items()}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        raw_windows = {
+            country: analyze_country(rows, LATEST_CALL, window_days, sketch_durations)
+            for country, rows in by_country.items()
+        }
+
+    def fix_every_window():
+        # fix_missing_days only replaces whole weekdays, so a shallow copy keeps the inputs intact
+        for windows in raw_windows.values():
+            fallback = None
+            for key, (buckets, _) in windows.items():
+                fixed = fix_missing_days(dict(buckets), {}, window=key, fallback_from=fallback)
+                if key == "three_months":
+                    fallback = fixed
+
+    def pipeline():
+        for country, rows in by_country.items():
+            windows = analyze_country(rows, LATEST_CALL, window_days, sketch_durations)
+            build_country_results(country, windows, {})
+
+    n_windows = sum(len(windows) for windows in raw_windows.values())
+    return [
+        ("bucketize_calls", "rows", len(records), lambda: bucketize_calls(records)),
+        ("calculate_averages", "rows", len(records), lambda: calculate_averages(records)),
+        ("average_missing_day", "countries", len(three_months),
+         lambda: [average_missing_day(buckets) for buckets in three_months.values()]),
+        ("fix_missing_days", "windows", n_windows, fix_every_window),
+        ("pipeline", "rows", len(records), pipeline),
+    ]
+
+
+def calibrate(loops=CALIBRATION_LOOPS):
+    """Fixed pure-Python work of the same kind as the analysis: tuple keys, dict updates, arithmetic."""
+    counts = {}
+    for i in range(loops):
+        key = (i % 7, i % 24)
+        counts[key] = counts.get(key, 0) + i % 3
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def measure(fn, runs=RUNS):
+    """
+    (median seconds per call, median ratio of a call to the calibration loop run
+    next to it, peak bytes allocated during one call), with the cron's prints discarded.
+    """
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        timings = []
+        ratios = []
+        while len(timings) < runs or sum(timings) < MIN_SECONDS:
+            seconds = timed(fn)
+            timings.append(seconds)
+            ratios.append(seconds / timed(calibrate))
+
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return statistics.median(timings), statistics.median(ratios), peak
+
+
+def load_baseline(path):
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())["results"]
+
+
+def save_baseline(path, results):
+    merged = load_baseline(path)
+    merged.update(results)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": dict(sorted(merged.items())),
+    }, indent=2) + "\n")
+
+
+def run_size(size, baseline, tolerance, runs, results, regressions):
+    """Benchmark every case at one size; the generated calls are freed on return."""
+    for name, units, n_units, fn in cases(*load_calls(SIZES[size])):
+        seconds, calibrated, peak = measure(fn, runs)
+        key = f"{name}/{size}"
+        results[key] = {
+            "seconds": seconds,
+            "calibrated": calibrated,
+            "throughput": n_units / seconds,
+            "units": units,
+            "peak_bytes": peak,
+        }
+
+        comparison = "no baseline"
+        base = baseline.get(key)
+        # Baselines recorded before calibration have nothing to compare against
+        if base and "calibrated" in base:
+            time_ratio = calibrated / base["calibrated"]
+            memory_ratio = max(peak, MEMORY_FLOOR) / max(base["peak_bytes"], MEMORY_FLOOR)
+            comparison = f"{time_ratio:5.2f}x {memory_ratio:5.2f}x"
+            if time_ratio > tolerance or memory_ratio > tolerance:
+                comparison += "  REGRESSION"
+                regressions.append(key)
+        print(
+            f"{name:<20}{size:>5}{seconds * 1000:>10.2f}ms{n_units / seconds:>12.0f} {units:<9}"
+            f"{peak / 2**20:>7.1f} MiB  {comparison}"
+        )
+
+
+def main(sizes, baseline_path: Path, tolerance: float, runs: int, save: bool) -> int:
+    # fix_missing_days logs each decision at DEBUG, the dev log level; time it as production runs it
+    logging.disable(logging.DEBUG)
+    baseline = load_baseline(baseline_path)
+    results = {}
+    regressions = []
+    print(f"{'function':<20}{'size':>5}{'per call':>12}{'throughput':>22}{'peak':>11}  vs baseline (calibrated time, memory)")
+    for size in sizes:
+        run_size(size, baseline, tolerance, runs, results, regressions)
+        gc.collect()
+
+    if save:
+        save_baseline(baseline_path, results)
+        print(f"Baseline saved to {baseline_path}")
+    if regressions:
+        print(f"Regressions beyond {tolerance}x: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10k,1m,10m", help=f"Comma-separated, any of {', '.join(SIZES)}")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Allowed slowdown/memory growth ratio")
+    parser.add_argument("--runs", type=int, default=RUNS, help="Timed calls per function; the median is kept")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+    sizes = args.sizes.split(",")
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+    sys.exit(main(sizes, args.baseline, args.tolerance, args.runs, args.save_baseline))
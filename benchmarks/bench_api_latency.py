@@ -0,0 +1,131 @@
+# benchmarks/bench_api_latency.py
+"""
+p50/p99 latency of GET /analysis_of_calls under concurrent load for three
+stages of the endpoint:
+
+  parse        results file parsed and validated on every request, response
+               built through response_model (the original behaviour)
+  cached       AnalysisResultsCache model, still serialized via response_model
+  prerendered  the current route: cached bytes rendered once per result version
+
+plus a typical dialer query (five countries, seven_days only) on the current
+route, which clients previously could only get by downloading everything.
+Sizes are bytes on the wire with gzip accepted.
+
+Requests go through FastAPI in-process via httpx's ASGI transport, so
+the numbers cover routing, the service and response serialization but no
+network.
+
+    python -m benchmarks.bench_api_latency --countries 50 --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.dependencies import AnalysisServiceDep, get_analysis_service
+from app.api.main_router import api_router
+from app.api.routes.v1.analysis.cache import AnalysisResultsCache
+from app.api.routes.v1.analysis.schemas import AnalysisRead
+from app.api.routes.v1.analysis.services import AnalysisService
+from app.core.results_store import load_results, publish_results
+from benchmarks.bench_artifacts import sample_results
+
+URL = "/api/v1/analysis/analysis_of_calls"
+
+
+class ParseEveryRequest:
+    """Stands in for the cache with what the service used to do on each request."""
+
+    def __init__(self, results_dir: Path):
+        self.results_dir = results_dir
+
+    async def get_rendered(self):
+        return SimpleNamespace(results=AnalysisRead(data=load_results(self.results_dir)))
+
+
+def model_route_app():
+    """The endpoint as it was before pre-rendering: return the model, let response_model serialize it."""
+    app = FastAPI()
+
+    @app.get(URL, response_model=AnalysisRead)
+    async def get_analysis_of_calls(service: AnalysisServiceDep, country_code: Optional[str] = None):
+        return await service.get_analysis_of_calls(country_code)
+
+    return app
+
+
+def current_app():
+    app = FastAPI()
+    app.include_router(api_router)
+    return app
+
+
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+async def load_test(app, cache, params, n_requests, concurrency):
+    app.dependency_overrides[get_analysis_service] = lambda: AnalysisService(session=None, cache=cache)
+
+    latencies = []
+    sizes = []
+    pending = iter(range(n_requests))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in pending:
+                started = time.perf_counter()
+                response = await client.get(URL, params=params)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+                sizes.append(response.num_bytes_downloaded)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return percentile(latencies, 50), percentile(latencies, 99), n_requests / elapsed, sizes[-1]
+
+
+async def main(n_countries: int, n_requests: int, concurrency: int) -> None:
+    results = sample_results(n_countries)
+    with tempfile.TemporaryDirectory() as tmp:
+        results_dir = Path(tmp)
+        publish_results(results, "bench", results_dir=results_dir)
+        country = next(iter(results))
+        dialer = {"country_code": ",".join(list(results)[:5]), "windows": "seven_days"}
+        prerendered = ("prerendered", current_app, AnalysisResultsCache)
+
+        print(f"countries={n_countries} requests={n_requests} concurrency={concurrency}")
+        print(f"{'request':<10}{'stage':<13}{'p50':>10}{'p99':>10}{'req/s':>10}{'bytes':>10}")
+        all_stages = (
+            ("parse", model_route_app, ParseEveryRequest),
+            ("cached", model_route_app, AnalysisResultsCache),
+            prerendered,
+        )
+        requests = (
+            ("country", {"country_code": country}, all_stages),
+            ("all", {}, all_stages),
+            ("dialer", dialer, (prerendered,)),
+        )
+        for label, params, stages in requests:
+            for name, make_app, make_cache in stages:
+                p50, p99, rps, size = await load_test(make_app(), make_cache(results_dir), params, n_requests, concurrency)
+                print(f"{label:<10}{name:<13}{p50 * 1000:>8.2f}ms{p99 * 1000:>8.2f}ms{rps:>10.0f}{size:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--countries", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.countries, args.requests, args.concurrency))
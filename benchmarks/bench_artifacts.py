@@ -0,0 +1,74 @@
+# benchmarks/bench_artifacts.py
+"""
+File size, write time and load time of the analysis results: the old
+`json.dump(indent=4)` best_times.json vs the compact orjson versions written
+by publish_results.
+
+Countries are cloned from the checked-in best_times.json so the payload has
+the real shape; --countries sets how many.
+
+    python -m benchmarks.bench_artifacts --countries 200
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import orjson
+
+from app.core.results_store import LEGACY_FILE, RESULTS_DIR, load_results, publish_results
+
+
+def sample_results(n_countries):
+    with open(RESULTS_DIR / LEGACY_FILE, "r") as f:
+        seed = list(json.load(f).values())
+    return {str(1000 + i): seed[i % len(seed)] for i in range(n_countries)}
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(n_countries: int, repeat: int) -> None:
+    results = sample_results(n_countries)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        legacy = tmp / LEGACY_FILE
+
+        def write_legacy():
+            with open(legacy, "w") as f:
+                json.dump(results, f, default=str, indent=4)
+
+        def load_legacy():
+            with open(legacy, "r") as f:
+                return json.load(f)
+
+        versions = iter(range(10**9))
+        legacy_write = best_of(write_legacy, repeat)
+        versioned_write = best_of(lambda: publish_results(results, f"bench-{next(versions)}", results_dir=tmp), repeat)
+        versioned = max((tmp / "versions").iterdir(), key=os.path.getmtime)
+
+        legacy_load = best_of(load_legacy, repeat)
+        versioned_load = best_of(lambda: load_results(tmp), repeat)
+        same = load_legacy() == load_results(tmp) == orjson.loads(versioned.read_bytes())
+
+        print(f"countries={n_countries}")
+        print(f"{'format':<16}{'size':>12}{'write':>12}{'load':>12}")
+        print(f"{'json indent=4':<16}{legacy.stat().st_size / 1024:>9.1f}KiB{legacy_write * 1000:>10.2f}ms{legacy_load * 1000:>10.2f}ms")
+        print(f"{'orjson versioned':<16}{versioned.stat().st_size / 1024:>9.1f}KiB{versioned_write * 1000:>10.2f}ms{versioned_load * 1000:>10.2f}ms")
+        print(f"identical={same}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--countries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.countries, args.repeat)
@@ -0,0 +1,57 @@
+# benchmarks/bench_compression.py
+"""
+Bytes on the wire and CPU per request for /analysis_of_calls bodies:
+compressing each response on the fly (at the levels the cache uses)
+vs picking the variant precompressed once per result version.
+
+Brotli is included when the `brotli` package is installed.
+
+    python -m benchmarks.bench_compression --countries 200
+"""
+import argparse
+import gzip
+import time
+
+from app.api.routes.v1.analysis.cache import BROTLI_QUALITY, GZIP_LEVEL, RenderedResults, brotli
+from app.api.routes.v1.analysis.schemas import AnalysisRead
+from benchmarks.bench_artifacts import sample_results
+
+
+def cpu_per_call(fn, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - started) / repeat
+
+
+def main(n_countries: int, repeat: int) -> None:
+    results = AnalysisRead(data=sample_results(n_countries))
+    started = time.process_time()
+    rendered = RenderedResults(results)
+    render_cpu = time.process_time() - started
+    print(f"countries={n_countries}  render+compress once per version: {render_cpu * 1000:.1f}ms CPU")
+
+    accept = "br, gzip" if brotli is not None else "gzip"
+    samples = (("all", rendered.all_body), ("country", next(iter(rendered.country_bodies.values()))))
+    print(f"{'body':<9}{'encoding':<10}{'bytes':>10}{'saved':>8}{'on-the-fly':>14}{'precomputed':>14}")
+    for label, body in samples:
+        print(f"{label:<9}{'identity':<10}{len(body.content):>10}{'':>8}{'':>14}{'':>14}")
+        for coding, (compressed, _) in body.encodings.items():
+            if coding == "gzip":
+                on_the_fly = cpu_per_call(lambda: gzip.compress(body.content, compresslevel=GZIP_LEVEL), repeat)
+            else:
+                on_the_fly = cpu_per_call(lambda: brotli.compress(body.content, quality=BROTLI_QUALITY), repeat)
+            precomputed = cpu_per_call(lambda: body.negotiate(accept), repeat * 100)
+            saved = 1 - len(compressed) / len(body.content)
+            print(
+                f"{'':<9}{coding:<10}{len(compressed):>10}{saved:>7.1%}"
+                f"{on_the_fly * 1e6:>12.1f}us{precomputed * 1e6:>12.2f}us"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--countries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.countries, args.repeat)
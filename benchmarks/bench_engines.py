@@ -0,0 +1,70 @@
+# benchmarks/bench_engines.py
+"""
+Time the pure-Python and NumPy analysis engines on one country's rows for
+both windows, and check they produce identical output.
+
+The NumPy engine is timed from the integer columns the cron streams into
+CallColumns (slot and age come from MySQL), and separately from CallRecord
+tuples, where unpacking every datetime in Python dominates.
+
+    python -m benchmarks.bench_engines --rows 3000000
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from app.workers.utils.analysis import bucketize_calls, calculate_averages
+from app.workers.utils.vectorized import CallArrays, CallColumns, analyze_windows_np
+from benchmarks.synthetic import LATEST_CALL, call_records
+
+
+def python_engine(rows, cutoffs):
+    results = {}
+    for key, cutoff in cutoffs.items():
+        window_rows = [r for r in rows if r.call_start_time >= cutoff]
+        results[key] = (bucketize_calls(window_rows), calculate_averages(window_rows))
+    return results
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main(n_rows: int) -> None:
+    print(f"Generating {n_rows} call records...")
+    rows = call_records(n_rows)
+    cutoffs = {
+        "three_months": LATEST_CALL - timedelta(days=90),
+        "seven_days": LATEST_CALL - timedelta(days=7),
+    }
+
+    window_days = {"three_months": 90, "seven_days": 7}
+
+    # What stream_country_columns collects while fetching
+    columns = CallColumns()
+    for r in rows:
+        age = LATEST_CALL - r.call_start_time
+        columns.append(
+            r.call_start_time.weekday() * 24 + r.call_start_time.hour,
+            age.days * 86400 + age.seconds,
+            r.total_call,
+            r.DTMF,
+        )
+
+    expected, python_s = timed(python_engine, rows, cutoffs)
+    got, numpy_s = timed(lambda: analyze_windows_np(CallArrays.from_columns(columns), window_days))
+    got_records, records_s = timed(lambda: analyze_windows_np(CallArrays.from_records(rows, LATEST_CALL), window_days))
+
+    print(f"python          {python_s:8.3f}s  {n_rows / python_s:>12.0f} rows/s")
+    print(f"numpy/columns   {numpy_s:8.3f}s  {n_rows / numpy_s:>12.0f} rows/s  {python_s / numpy_s:6.1f}x")
+    print(f"numpy/records   {records_s:8.3f}s  {n_rows / records_s:>12.0f} rows/s  {python_s / records_s:6.1f}x")
+    print(f"identical={got == expected and got_records == expected}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    args = parser.parse_args()
+    main(args.rows)
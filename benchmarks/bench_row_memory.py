@@ -0,0 +1,77 @@
+# benchmarks/bench_row_memory.py
+"""
+Peak memory and time of the cron's row fetch: full JobInvite ORM entities
+(the old `select(JobInvite)` path) vs the CallRecord projection vs the
+streaming engine, which keeps only per-country day/slot counts.
+
+    python -m benchmarks.bench_row_memory --rows 1000000
+"""
+import argparse
+import asyncio
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from app.api.routes.v1.analysis.models import JobInvite
+from app.workers.utils.find_and_analyze_cron import stream_country_counts, stream_country_records
+from benchmarks.standin_db import make_engine, populate, session_maker
+from benchmarks.synthetic import LATEST_CALL, jobinvite_rows
+
+
+async def stream_orm_entities(session, start_date):
+    """The pre-projection fetch, kept here as the comparison baseline."""
+    stmt = select(JobInvite).where(JobInvite.call_start_time >= start_date)
+    country_map = defaultdict(list)
+    async for row in (await session.stream(stmt.execution_options(yield_per=1000))).scalars():
+        country_map[str(row.countryCode)].append(row)
+    return country_map
+
+
+async def stream_counts(session, start_date):
+    return await stream_country_counts(session, start_date, LATEST_CALL)
+
+
+def rows_held(fetched):
+    """Rows behind a fetch result: list lengths, or DailySlotCounts.seen for streamed counts."""
+    return sum(len(v) if isinstance(v, list) else v.seen for v in fetched.values())
+
+
+async def measure(label, fetch, maker, start_date):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    async with maker() as session:
+        country_map = await fetch(session, start_date)
+        rows = rows_held(country_map)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del country_map
+    print(f"{label:<12} rows={rows:>9}  time={elapsed:8.2f}s  rows/s={rows / elapsed:>10.0f}  peak={peak / 2**20:9.1f} MiB")
+
+
+async def main(n_rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(os.path.join(tmp, "jobinvite.sqlite"))
+        print(f"Populating {n_rows} synthetic jobinvite rows...")
+        await populate(engine, jobinvite_rows(n_rows))
+        maker = session_maker(engine)
+        start_date = LATEST_CALL - timedelta(days=90)
+
+        await measure("orm", stream_orm_entities, maker, start_date)
+        await measure("projection", stream_country_records, maker, start_date)
+        await measure("streaming", stream_counts, maker, start_date)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
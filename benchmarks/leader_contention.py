@@ -0,0 +1,96 @@
+# benchmarks/leader_contention.py
+"""
+Leader election under contention: --processes processes (standing in for
+uvicorn workers or pods) all fire the analysis job at the same moments, for
+--ticks ticks, against one SQLite stand-in database (lease mode) or one lock
+file (file mode). Each tick should have exactly one leader.
+
+The first leader exits without resigning after --crash-after ticks, like a
+killed pod. The lease then stays taken until it expires, after which another
+process takes over; a file lock is released by the OS right away.
+
+    python -m benchmarks.leader_contention --processes 8 --ticks 8 --mode lease
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from app.api.routes.v1.analysis.models import AnalysisLease
+from app.workers.utils.leader import HOLDER, leadership
+from benchmarks.standin_db import make_engine, session_maker
+
+
+def contender(db_path, mode, first_tick_at, ticks, interval, lease_seconds, crash_after, events, crashed):
+    async def run():
+        engine = make_engine(db_path, connect_args={"timeout": 30})
+        maker = session_maker(engine)
+        for tick in range(ticks):
+            await asyncio.sleep(max(0.0, first_tick_at + tick * interval - time.time()))
+            async with leadership("bench", mode=mode, session_maker=maker, lease_seconds=lease_seconds) as leader:
+                if leader:
+                    events.put((tick, HOLDER))
+                    await asyncio.sleep(interval / 4)  # the "analysis"
+            if leader and tick + 1 == crash_after and not crashed.is_set():
+                crashed.set()
+                os._exit(0)
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+async def create_lease_table(db_path):
+    engine = make_engine(db_path)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: AnalysisLease.__table__.create(sync_conn, checkfirst=True))
+    await engine.dispose()
+
+
+def main(n_processes: int, ticks: int, interval: float, lease_seconds: int, crash_after: int, mode: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "standin.sqlite")
+        asyncio.run(create_lease_table(db_path))
+        # Children read it through CronSettings for the file mode
+        os.environ["ANALYSIS_LOCK_FILE"] = os.path.join(tmp, "analysis.lock")
+
+        context = multiprocessing.get_context("spawn")
+        events = context.Queue()
+        crashed = context.Event()
+        first_tick_at = time.time() + 3  # leave time for the spawned interpreters to start
+        processes = [
+            context.Process(
+                target=contender,
+                args=(db_path, mode, first_tick_at, ticks, interval, lease_seconds, crash_after, events, crashed),
+            )
+            for _ in range(n_processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        leaders = defaultdict(list)
+        while not events.empty():
+            tick, holder = events.get()
+            leaders[tick].append(holder)
+
+        print(f"mode={mode} processes={n_processes} interval={interval}s lease={lease_seconds}s crash_after={crash_after}")
+        print(f"{'tick':<6}{'leaders':>8}  holder")
+        for tick in range(ticks):
+            print(f"{tick:<6}{len(leaders[tick]):>8}  {', '.join(leaders[tick]) or '-'}")
+        print(f"ticks with more than one leader: {sum(len(h) > 1 for h in leaders.values())}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--ticks", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between job triggers")
+    parser.add_argument("--lease-seconds", type=int, default=3)
+    parser.add_argument("--crash-after", type=int, default=3, help="Ticks before the first leader dies (0: never)")
+    parser.add_argument("--mode", choices=("lease", "file"), default="lease")
+    args = parser.parse_args()
+    main(args.processes, args.ticks, args.interval, args.lease_seconds, args.crash_after, args.mode)
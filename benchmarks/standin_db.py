@@ -0,0 +1,59 @@
+# benchmarks/standin_db.py
+"""SQLite stand-in for the MySQL jobinvite table, with the MySQL functions the cron and the analysis lease use."""
+from datetime import datetime, timezone
+from itertools import islice
+
+from sqlalchemy import event, insert
+from sqlalchemy.dialects.mysql import MEDIUMINT, TINYINT
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from app.api.routes.v1.analysis.models import JobInvite
+from app.workers.utils.leader import utc_after
+
+
+@compiles(TINYINT, "sqlite")
+@compiles(MEDIUMINT, "sqlite")
+def _compile_small_int(type_, compiler, **kw):
+    return "INTEGER"
+
+
+@compiles(utc_after, "sqlite")
+def _compile_utc_after(element, compiler, **kw):
+    return f"datetime(utc_timestamp(), {compiler.process(element.clauses, **kw)} || ' seconds')"
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _parse(value):
+    return datetime.fromisoformat(str(value)) if value is not None else None
+
+
+def _register_mysql_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function("weekday", 1, lambda v: None if v is None else _parse(v).weekday())
+    dbapi_connection.create_function("hour", 1, lambda v: None if v is None else _parse(v).hour)
+    dbapi_connection.create_function("char_length", 1, lambda v: None if v is None else len(v))
+    dbapi_connection.create_function(
+        "utc_timestamp", 0, lambda: datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    )
+    dbapi_connection.create_function("to_seconds", 1, lambda v: None if v is None else int((_parse(v) - _EPOCH).total_seconds()))
+
+
+def make_engine(path: str, **engine_kwargs) -> AsyncEngine:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", **engine_kwargs)
+    event.listen(engine.sync_engine, "connect", _register_mysql_functions)
+    return engine
+
+
+async def populate(engine: AsyncEngine, rows, batch_size: int = 10_000) -> None:
+    """Create jobinvite and bulk insert `rows` (an iterable of column dicts)."""
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: JobInvite.__table__.create(sync_conn, checkfirst=True))
+        rows = iter(rows)
+        while batch := list(islice(rows, batch_size)):
+            await conn.execute(insert(JobInvite.__table__), batch)
+
+
+def session_maker(engine: AsyncEngine):
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
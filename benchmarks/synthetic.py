@@ -0,0 +1,129 @@
+# benchmarks/synthetic.py
+import random
+from datetime import datetime, timedelta
+
+LATEST_CALL = datetime(2025, 8, 20, 18, 0, 0)
+
+
+# Realistic profile (realistic_calls): a few large markets and a long tail
+COUNTRY_WEIGHTS = {91: 55, 1: 14, 44: 9, 971: 6, 65: 4, 61: 3, 234: 3, 27: 2, 880: 2, None: 2}
+# Weekdays (0 = Monday) a country never calls on, so fix_missing_days has gaps to fill
+QUIET_WEEKDAYS = {971: (4, 5), 234: (5, 6), 27: (0, 2, 4, 6), 880: (1, 3, 5, 6), None: (2, 3, 4, 5, 6)}
+# Calls per hour of the day: overnight trough, late-morning and early-evening peaks
+HOURLY_WEIGHTS = (1, 1, 1, 1, 1, 2, 4, 8, 12, 16, 18, 17, 14, 13, 15, 17, 18, 16, 13, 10, 7, 4, 2, 1)
+# Answers to 1-5 questions, with the odd empty entry or stray space the parser has to skip
+DTMF_ANSWERS = (
+    "1", "2", "1,2", "2,1", "1,2,1", "1,1,2", "2,,1", "1, 2,1", "1,2,1,2", "2,1,1,2,1", "1,2,,1,2,", " ,1",
+)
+
+
+def jobinvite_row(nid, country_code, started, total_call, dtmf):
+    """A dict with every NOT NULL jobinvite column filled around the analysis columns."""
+    return {
+        "nid": nid,
+        "jobnumber": nid // 50,
+        "empnumber": nid // 5000,
+        "name": f"Candidate {nid}",
+        "mobileNo": f"9{nid:09d}",
+        "countryCode": country_code,
+        "emailid": f"candidate{nid}@example.com",
+        "email_set": 0,
+        "NCALLSTATUS": 1,
+        "admin_status": 0,
+        "NSMSSENT": 0,
+        "STRSMSREF": "",
+        "SMSSENTDT": started,
+        "INSTCALDT": started,
+        "DTMF": dtmf,
+        "RESDT": started,
+        "total_call": total_call,
+        "CALMINUTES": 0,
+        "call_start_time": started,
+        "call_end_time": started,
+        "CALLTYPE": 0,
+        "SCHEDULEDTIME": started,
+        "UPDATIONDATE": started,
+        "upload_type": 2,
+        "COMMENT": "Recruiter note " * 4,
+        "NTIMEZONE": 1,
+        "NCALLIFYREFINVID": 0,
+    }
+
+
+def jobinvite_rows(n, seed=42, days=100, latest=LATEST_CALL):
+    """
+    Yield `n` deterministic dicts with every NOT NULL jobinvite column filled.
+    The last row always lands on `latest` so MAX(call_start_time) is stable.
+    """
+    rnd = random.Random(seed)
+    countries = [91] * 6 + [1, 44, 971, None]
+    durations = [0, 0, 0, 12, 45, 90, 130, 240, 600]
+    dtmfs = [None, "", "1", "1,2", "1,2,1", "2,,1"]
+    for nid in range(1, n + 1):
+        if nid == n:
+            started = latest
+        else:
+            started = latest - timedelta(seconds=rnd.randrange(days * 86400))
+        country_code = rnd.choice(countries)
+        dtmf = rnd.choice(dtmfs)
+        yield jobinvite_row(nid, country_code, started, rnd.choice(durations), dtmf)
+
+
+def realistic_calls(n, seed=42, days=90, latest=LATEST_CALL):
+    """
+    Yield `n` deterministic (countryCode, call_start_time, total_call, DTMF) calls
+    over the `days` days before `latest`, oldest first, the last one exactly on
+    `latest`. Countries are skewed (COUNTRY_WEIGHTS) and some never call on
+    QUIET_WEEKDAYS; hours follow HOURLY_WEIGHTS, and busier hours are answered
+    more often. Only one day of calls is held at a time.
+    """
+    rnd = random.Random(seed)
+    hours = range(24)
+    peak = max(HOURLY_WEIGHTS)
+    # Per weekday: the countries calling that day and their cumulative weights
+    callers = []
+    for weekday in range(7):
+        codes = [c for c in COUNTRY_WEIGHTS if weekday not in QUIET_WEEKDAYS.get(c, ())]
+        weights = [COUNTRY_WEIGHTS[c] for c in codes]
+        callers.append((codes, [sum(weights[:i + 1]) for i in range(len(weights))]))
+
+    for day in range(days):
+        day_start = latest - timedelta(days=days - day)
+        n_day = n * (day + 1) // days - n * day // days
+        started = sorted(
+            day_start.replace(minute=0, second=0, microsecond=0)
+            + timedelta(hours=(hour - day_start.hour) % 24, seconds=rnd.randrange(3600))
+            for hour in rnd.choices(hours, weights=HOURLY_WEIGHTS, k=n_day)
+        )
+        if day == days - 1 and started:
+            started[-1] = latest
+        for moment in started:
+            codes, cum_weights = callers[moment.weekday()]
+            country_code = rnd.choices(codes, cum_weights=cum_weights)[0]
+            if rnd.random() > 0.3 + 0.5 * HOURLY_WEIGHTS[moment.hour] / peak:
+                yield country_code, moment, 0, rnd.choice((None, ""))
+            elif rnd.random() < 0.55:
+                # Hung up early: not interested
+                yield country_code, moment, min(119, 1 + int(rnd.expovariate(1 / 35))), rnd.choice((None, "1", "2"))
+            else:
+                yield country_code, moment, 120 + int(rnd.lognormvariate(5.3, 0.6)), rnd.choice(DTMF_ANSWERS)
+
+
+def realistic_jobinvite_rows(n, seed=42, days=90, latest=LATEST_CALL):
+    """realistic_calls as full jobinvite row dicts, nid in call order."""
+    for nid, (country_code, started, total_call, dtmf) in enumerate(realistic_calls(n, seed, days, latest), start=1):
+        yield jobinvite_row(nid, country_code, started, total_call, dtmf)
+
+
+def call_records(n, seed=42, days=90, latest=LATEST_CALL):
+    """`n` CallRecord tuples for a single country, oldest first, ending at `latest`."""
+    from app.workers.utils.analysis import CallRecord
+
+    rnd = random.Random(seed)
+    durations = [0, 0, 0, 12, 45, 90, 130, 240, 600]
+    dtmfs = [None, "", "1", "1,2", "1,2,1", "2,,1"]
+    offsets = sorted((rnd.randrange(days * 86400) for _ in range(n - 1)), reverse=True) + [0]
+    return [
+        CallRecord(latest - timedelta(seconds=offset), rnd.choice(durations), rnd.choice(dtmfs))
+        for offset in offsets
+    ]
@@ -1,8 +1,13 @@
 # main.py
 from fastapi import FastAPI
 from app.api.main_router import api_router
+from app.config import app_settings
 from app.core.logger import setup_logger
-from app.workers.worker import lifespan
+
+if app_settings.API_RUN_SCHEDULER:
+    from app.workers.worker import lifespan
+else:
+    from app.api.lifespan import lifespan
 
 logger = setup_logger("main")
 
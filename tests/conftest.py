@@ -0,0 +1,79 @@
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+from functools import partial
+
+import pytest
+
+# app.config builds DatabaseSettings at import time; the tests never reach MySQL.
+for _key, _value in {
+    "MYSQL_SERVER": "localhost",
+    "MYSQL_PORT": "3306",
+    "MYSQL_USER": "test",
+    "MYSQL_PASSWORD": "test",
+    "MYSQL_DB": "test",
+    "MYSQL_POOL_WARMUP": "false",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+# Imported once the settings above are in place
+from app.core import results_store
+from app.workers.utils import find_and_analyze_cron as cron
+from benchmarks.standin_db import make_engine, populate, session_maker
+from benchmarks.synthetic import jobinvite_rows
+
+
+@pytest.fixture
+def results_dir(tmp_path, monkeypatch):
+    """Point the cron's results store at a temporary directory."""
+    path = tmp_path / "results"
+    for name in ("read_manifest", "current_results_path", "load_results", "publish_results"):
+        monkeypatch.setattr(cron, name, partial(getattr(results_store, name), results_dir=path))
+    return path
+
+
+@pytest.fixture
+def standin_db(tmp_path):
+    """
+    A SQLite stand-in for jobinvite holding 300 calls over 100 days: most
+    countries have missing and weak weekdays, so results lean on averaged days.
+    """
+    path = tmp_path / "jobinvite.sqlite"
+
+    async def create():
+        engine = make_engine(str(path))
+        await populate(engine, jobinvite_rows(300))
+        await engine.dispose()
+
+    asyncio.run(create())
+    return path
+
+
+@pytest.fixture
+def run_cron(standin_db, results_dir, monkeypatch):
+    """
+    Run the cron as a first, forced, sequential run over standin_db with the
+    given ANALYSIS_ENGINE, and return the published results.
+    """
+    def run(engine_name="python"):
+        # No previous results to fall back on
+        shutil.rmtree(results_dir, ignore_errors=True)
+        monkeypatch.setattr(cron.cron_days_settings, "ANALYSIS_ENGINE", engine_name)
+        monkeypatch.setattr(cron.cron_days_settings, "ANALYSIS_PARALLEL", False)
+
+        async def generate():
+            engine = make_engine(str(standin_db))
+            monkeypatch.setattr(cron, "async_session_maker", session_maker(engine))
+            monkeypatch.setattr(cron, "read_session_maker", session_maker(engine))
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    await cron.generate_best_times_new(force=True)
+            finally:
+                await engine.dispose()
+
+        asyncio.run(generate())
+        return results_store.load_results(results_dir)
+
+    return run
@@ -0,0 +1,11 @@
+import json
+
+from app.workers.utils import find_and_analyze_cron as cron
+
+
+def test_numpy_engine_matches_python_engine_on_sparse_data(run_cron, monkeypatch):
+    # Averaged days have to round exactly like the Python engine's, quantiles included
+    monkeypatch.setattr(cron.cron_days_settings, "ANALYSIS_DURATION_QUANTILES", True)
+    expected = run_cron("python")
+    got = run_cron("numpy")
+    assert json.dumps(got, indent=4) == json.dumps(expected, indent=4)
@@ -0,0 +1,46 @@
+import asyncio
+import contextlib
+import io
+
+from app.workers.utils import find_and_analyze_cron as cron
+from benchmarks.standin_db import make_engine, session_maker
+
+
+def test_fingerprint_spans_only_the_due_windows(run_cron, standin_db, monkeypatch):
+    run_cron()
+    scanned = []
+    source_fingerprint = cron.source_fingerprint
+
+    async def recording_fingerprint(session, latest_date, days, settings):
+        scanned.append(days)
+        return await source_fingerprint(session, latest_date, days, settings)
+
+    monkeypatch.setattr(cron, "source_fingerprint", recording_fingerprint)
+
+    def tick(refresh_seconds):
+        monkeypatch.setattr(cron.cron_days_settings, "WINDOW_REFRESH_SECONDS", refresh_seconds)
+
+        async def generate():
+            engine = make_engine(str(standin_db))
+            monkeypatch.setattr(cron, "async_session_maker", session_maker(engine))
+            monkeypatch.setattr(cron, "read_session_maker", session_maker(engine))
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    await cron.generate_best_times_new()
+            finally:
+                await engine.dispose()
+
+        asyncio.run(generate())
+        return cron.read_manifest()["run_id"]
+
+    windows = cron.cron_days_settings.ANALYSIS_WINDOWS
+    # The long window is not due: the fingerprint reaches back to the longest short one
+    tick({"three_months": 86400})
+    assert scanned == [max(days for key, days in windows.items() if key != "three_months")]
+    # Nothing due: no fingerprint query at all
+    tick({key: 86400 for key in windows})
+    assert len(scanned) == 1
+    # Every window due, unchanged data: the second full tick publishes nothing
+    run_id = tick({})
+    assert tick({}) == run_id
+    assert scanned[1:] == [windows["three_months"]] * 2
@@ -0,0 +1,43 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from app.api import dependencies
+from app.api.main_router import api_router
+from app.api.routes.v1.analysis.cache import results_cache
+from benchmarks.standin_db import make_engine, session_maker
+
+
+def test_results_endpoints_check_out_no_connection(run_cron, standin_db, results_dir, monkeypatch):
+    run_cron()
+    monkeypatch.setattr(results_cache, "results_dir", results_dir)
+    monkeypatch.setattr(results_cache, "_key", None)
+    app = FastAPI()
+    app.include_router(api_router)
+
+    async def run():
+        engine = make_engine(str(standin_db))
+        checkouts = []
+        event.listen(engine.sync_engine.pool, "checkout", lambda *args: checkouts.append(args))
+        monkeypatch.setattr(dependencies, "async_session_maker", session_maker(engine))
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                for path in (
+                    "/api/v1/analysis/analysis_of_calls",
+                    "/api/v1/analysis/analysis_of_calls?country_code=91&windows=seven_days",
+                    "/api/v1/analysis/best_slots?country_code=91",
+                ):
+                    response = await client.get(path)
+                    assert response.status_code == 200, (path, response.text)
+            served = len(checkouts)
+            # The counter does see a checkout when one happens
+            async with engine.connect():
+                pass
+        finally:
+            await engine.dispose()
+        return served, len(checkouts)
+
+    assert asyncio.run(run()) == (0, 1)
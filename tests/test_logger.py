@@ -0,0 +1,33 @@
+import io
+import logging
+import queue
+from logging.handlers import QueueListener
+
+import orjson
+
+from app.core.logger import RecordQueueHandler, build_handlers
+
+
+def test_json_exception_line_has_exc_info(tmp_path):
+    log_queue = queue.SimpleQueue()
+    stream = io.StringIO()
+    listener = QueueListener(log_queue, *build_handlers(str(tmp_path), stream, json_output=True))
+    logger = logging.getLogger("tests.json_exception")
+    logger.propagate = False
+    handler = RecordQueueHandler(log_queue)
+    logger.addHandler(handler)
+    listener.start()
+    try:
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("Failed for %s", "91")
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+        for file_handler in listener.handlers:
+            file_handler.close()
+
+    entry = orjson.loads(stream.getvalue().splitlines()[-1])
+    assert entry["message"] == "Failed for 91"
+    assert "ZeroDivisionError: division by zero" in entry["exc_info"]
@@ -0,0 +1,26 @@
+import asyncio
+
+import httpx
+
+from app.core import metrics
+from app.workers.metrics_server import CONTENT_TYPE, start_metrics_server
+
+
+def test_worker_serves_metrics():
+    async def run():
+        server = await start_metrics_server("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+                found = await client.get("/metrics")
+                missing = await client.get("/")
+        finally:
+            server.close()
+            await server.wait_closed()
+        return found, missing
+
+    found, missing = asyncio.run(run())
+    assert found.status_code == 200
+    assert found.headers["content-type"] == CONTENT_TYPE
+    assert found.text == metrics.render()
+    assert missing.status_code == 404
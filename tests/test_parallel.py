@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from app.workers.utils import find_and_analyze_cron as cron
+from benchmarks.synthetic import LATEST_CALL
+
+
+def test_failed_shard_cancels_the_others(monkeypatch):
+    cancelled = []
+
+    async def fetch_country_shard(country_code, start_date, latest_date, semaphore, sample_rate=None):
+        if country_code == "bad":
+            raise RuntimeError("shard failed")
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.append(country_code)
+            raise
+
+    async def run():
+        with pytest.raises(RuntimeError, match="shard failed"):
+            await cron.analyze_countries_parallel(
+                ["91", "bad", "44"], LATEST_CALL, LATEST_CALL, {"three_months": 90}, {}
+            )
+        # Checked before asyncio.run cancels whatever is left over
+        assert sorted(cancelled) == ["44", "91"]
+
+    monkeypatch.setattr(cron, "fetch_country_shard", fetch_country_shard)
+    asyncio.run(run())
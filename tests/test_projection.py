@@ -0,0 +1,25 @@
+import asyncio
+
+from app.api.routes.v1.analysis.cache import results_cache
+from app.api.routes.v1.analysis.services import AnalysisService
+
+
+def test_permuted_projections_share_one_body(run_cron, results_dir, monkeypatch):
+    data = run_cron()
+    monkeypatch.setattr(results_cache, "results_dir", results_dir)
+    monkeypatch.setattr(results_cache, "_key", None)
+    countries = list(data)[:3]
+    service = AnalysisService()
+
+    async def run():
+        first = await service.get_analysis_of_calls_body(
+            countries, ["seven_days", "thirty_days"], ["tue", "mon"], ["interested", "not_answered"]
+        )
+        again = await service.get_analysis_of_calls_body(
+            countries[::-1] + countries[:1], ["thirty_days", "seven_days"], ["mon", "tue", "mon"], ["not_answered", "interested"]
+        )
+        return first, again, (await results_cache.get_rendered()).projections
+
+    first, again, projections = asyncio.run(run())
+    assert again is first
+    assert len(projections) == 1
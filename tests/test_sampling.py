@@ -0,0 +1,41 @@
+from collections import Counter
+from datetime import timedelta
+
+from app.core.metrics import ANALYSIS_ROWS
+from app.workers.utils import find_and_analyze_cron as cron
+from app.workers.utils.sampling import HASH_MULTIPLIER, HASH_SPACE, MIN_SLOT_SAMPLE, sample_fields, wilson_width
+from benchmarks.synthetic import LATEST_CALL, jobinvite_rows
+
+
+def test_sampled_run_reports_the_rows_it_read(run_cron, monkeypatch):
+    rate, min_calls = 0.5, 40
+    monkeypatch.setattr(cron.cron_days_settings, "ANALYSIS_SAMPLE_RATE", rate)
+    monkeypatch.setattr(cron.cron_days_settings, "ANALYSIS_SAMPLE_MIN_CALLS", min_calls)
+    start_date = LATEST_CALL - timedelta(days=max(cron.cron_days_settings.ANALYSIS_WINDOWS.values()))
+    rows = [row for row in jobinvite_rows(300) if row["call_start_time"] >= start_date]
+    calls = Counter(row["countryCode"] for row in rows)
+    read = [
+        row for row in rows
+        if calls[row["countryCode"]] * rate < min_calls
+        or (row["nid"] * HASH_MULTIPLIER) % HASH_SPACE < rate * HASH_SPACE
+    ]
+    assert 0 < len(read) < len(rows)
+
+    results = run_cron()
+    assert ANALYSIS_ROWS.value() == len(read)
+    assert results["91"]["three_months"]["sample_rate"] == rate
+
+
+def test_sparse_slots_are_insufficient_and_do_not_set_the_window_width():
+    dense, sparse = [60, 20, 20], [1, 0, 1]
+    fields = sample_fields({(2, 10): dense, (2, 11): [30, 30, 40], (3, 10): sparse}, 0.1)
+    widths = fields["slot_interval_widths"]
+    assert widths["wed"]["11:01-12:00"] == round(max(wilson_width(k, 100) for k in (30, 30, 40)), 2)
+    assert widths["thu"]["10:01-11:00"] is None
+    assert sum(sparse) < MIN_SLOT_SAMPLE <= sum(dense)
+    assert fields["sample_size"] == 202
+    # The sparse slot's ~90 point width would have been the window's
+    assert fields["interval_width"] < max(wilson_width(k, 2) for k in sparse)
+    assert fields["interval_width"] == round(
+        (max(wilson_width(k, 100) for k in dense) + max(wilson_width(k, 100) for k in (30, 30, 40))) / 2, 2
+    )